@@ -5,13 +5,21 @@ A tool to detect potential prompt injection vulnerabilities in codebases.
 """
 
 import click
+import os
 import sys
+import threading
 from pathlib import Path
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.panel import Panel
 import json
 import yaml
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import orjson  # C-backed serializer, ~5-10x faster than stdlib json
+except Exception:
+    orjson = None
 
 from src.scanner.core import PromptScanner
 from src.reporting.cli import CLIReportGenerator
@@ -98,25 +106,47 @@ def scan(path_or_url, output, severity, exclude, parallel, verbose, no_cache, no
                 console=progress_console
             ) as progress:
                 task = progress.add_task("Scanning repository...", total=None)
-                results = scanner.scan(path)
+
+                # Sample the scanner's progress counters on a timer instead
+                # of rendering per file; one Rich update per tick keeps
+                # rendering off the scan's critical path
+                stop_sampler = threading.Event()
+
+                def _sample_progress():
+                    while not stop_sampler.wait(0.1):
+                        if scanner.files_total:
+                            progress.update(
+                                task,
+                                description=(
+                                    f"Scanning repository... "
+                                    f"{scanner.files_done}/{scanner.files_total} files"
+                                ),
+                            )
+
+                sampler = threading.Thread(target=_sample_progress, daemon=True)
+                sampler.start()
+                try:
+                    results = scanner.scan(path)
+                finally:
+                    stop_sampler.set()
+                    sampler.join()
                 progress.update(task, description="Generating report...")
         
-        # Generate report
+        # Generate report. The engine threshold (set above) filters fresh
+        # scans, but cache hits come back through cache.get_many() without
+        # re-running the rules, so warm results may carry findings from a
+        # lower-threshold run. Filter in place rather than rebuilding each
+        # ScanResult, the same pass the API handler uses.
         if min_confidence > 0:
-            # Filter results by min confidence
-            filtered = []
+            kept = []
             for r in results['results']:
-                kept = [f for f in r.findings if f.get('confidence', 0) >= min_confidence]
-                if kept:
-                    new_r = type(r)(
-                        file_path=r.file_path,
-                        findings=kept,
-                        scan_time=r.scan_time,
-                        file_size=r.file_size,
-                        language=r.language
-                    )
-                    filtered.append(new_r)
-            results['results'] = filtered
+                r.findings = [
+                    f for f in r.findings
+                    if f.get('confidence', 0) >= min_confidence
+                ]
+                if r.findings:
+                    kept.append(r)
+            results['results'] = kept
 
         if output == 'cli':
             reporter = CLIReportGenerator()
@@ -128,7 +158,7 @@ def scan(path_or_url, output, severity, exclude, parallel, verbose, no_cache, no
                 hide_context=hide_context,
             )
         elif output == 'json':
-            console.print(_serialize_scan_results_to_json(results))
+            _write_scan_results_json(results)
         elif output == 'html':
             # TODO: Implement HTML reporter
             console.print("[yellow]HTML output not yet implemented[/yellow]")
@@ -149,6 +179,94 @@ def scan(path_or_url, output, severity, exclude, parallel, verbose, no_cache, no
             except Exception:
                 pass
 
+# Per-process bench state: one loader/engine pair per worker process,
+# reused across the (threshold, strict) configurations that land on it
+_BENCH_LOADER = None
+_BENCH_ENGINE = None
+
+# language to extension for realistic file suffix
+_BENCH_LANG_EXT = {
+    'python': '.py',
+    'javascript': '.js',
+    'typescript': '.ts',
+}
+
+
+def _bench_eval_config(config):
+    """Evaluate one (threshold, strict, languages, bench-manifest) config.
+
+    Module-level and picklable-argument-only so the tune sweep can run it
+    in a process pool; a single bench run calls it in-process.
+    """
+    global _BENCH_LOADER, _BENCH_ENGINE
+    threshold, use_strict, selected_langs, bench = config
+
+    if _BENCH_LOADER is None:
+        from src.scanner.rule_engine import RuleEngine
+        _BENCH_LOADER = RuleLoader()
+        _BENCH_ENGINE = RuleEngine()
+    loader = _BENCH_LOADER
+    engine = _BENCH_ENGINE
+    engine.min_confidence_threshold = float(threshold)
+    engine.strict = bool(use_strict)
+
+    bench_paths = {
+        lang: Path(f"bench_{lang}{_BENCH_LANG_EXT.get(lang, '.txt')}")
+        for lang in selected_langs
+    }
+
+    total = tp = fp = fn = 0
+
+    # 1) Evaluate built-in rule examples
+    for lang in selected_langs:
+        rule_set = loader.get_rule_set(lang)
+        if not rule_set:
+            continue
+        for category, rules in rule_set.rules.items():
+            for rule in rules:
+                for ex in rule.examples.get('vulnerable', []):
+                    total += 1
+                    findings = engine.apply_rules(ex, bench_paths[lang], language=lang)
+                    tp += 1 if findings else 0
+                    fn += 0 if findings else 1
+                for ex in rule.examples.get('secure', []):
+                    total += 1
+                    findings = engine.apply_rules(ex, bench_paths[lang], language=lang)
+                    fp += 1 if findings else 0
+
+    # 2) Evaluate manifest suites if present
+    if bench and 'suites' in bench:
+        for suite_name, suite in bench['suites'].items():
+            for case in suite.get('cases', []):
+                lang = case.get('language')
+                if selected_langs and lang not in selected_langs:
+                    continue
+                label = case.get('label', 'vulnerable')
+                code = case.get('code', '')
+                total += 1
+                path = bench_paths.get(lang) or Path(f"bench_{lang}{_BENCH_LANG_EXT.get(lang, '.txt')}")
+                findings = engine.apply_rules(code, path, language=lang)
+                if label == 'vulnerable':
+                    tp += 1 if findings else 0
+                    fn += 0 if findings else 1
+                else:
+                    fp += 1 if findings else 0
+    precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
+    recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
+    f1 = (2 * precision * recall / (precision + recall)) if (precision + recall) > 0 else 0.0
+    return {
+        'total': total,
+        'tp': tp,
+        'fp': fp,
+        'fn': fn,
+        'precision': precision,
+        'recall': recall,
+        'f1': f1,
+        'threshold': threshold,
+        'strict': use_strict,
+    }
+
+
 @cli.command()
 @click.option('--examples-only', is_flag=True, help='Run benchmark against rule examples only')
 def rules():
@@ -201,79 +319,26 @@ def bench(language, manifest, min_confidence, strict, tune, min_precision, min_r
     loader = RuleLoader()
     selected_langs = set(language) if language else set(loader.get_supported_languages())
 
-    # language to extension for realistic file suffix
-    lang_ext = {
-        'python': '.py',
-        'javascript': '.js',
-        'typescript': '.ts',
-    }
-
-    def run_eval(threshold: float, use_strict: bool):
-        total = tp = fp = fn = 0
-        from src.scanner.rule_engine import RuleEngine
-        engine = RuleEngine()
-        engine.min_confidence_threshold = float(threshold)
-        engine.strict = bool(use_strict)
-
-        # 1) Evaluate built-in rule examples
-        for lang in selected_langs:
-            rule_set = loader.get_rule_set(lang)
-            if not rule_set:
-                continue
-            for category, rules in rule_set.rules.items():
-                for rule in rules:
-                    for ex in rule.examples.get('vulnerable', []):
-                        total += 1
-                        path = Path(f"bench_{lang}{lang_ext.get(lang, '.txt')}")
-                        findings = engine.apply_rules(ex, path, language=lang)
-                        tp += 1 if findings else 0
-                        fn += 0 if findings else 1
-                    for ex in rule.examples.get('secure', []):
-                        total += 1
-                        path = Path(f"bench_{lang}{lang_ext.get(lang, '.txt')}")
-                        findings = engine.apply_rules(ex, path, language=lang)
-                        fp += 1 if findings else 0
-
-        # 2) Evaluate manifest suites if present
-        if bench and 'suites' in bench:
-            for suite_name, suite in bench['suites'].items():
-                for case in suite.get('cases', []):
-                    lang = case.get('language')
-                    if selected_langs and lang not in selected_langs:
-                        continue
-                    label = case.get('label', 'vulnerable')
-                    code = case.get('code', '')
-                    total += 1
-                    path = Path(f"bench_{lang}{lang_ext.get(lang, '.txt')}")
-                    findings = engine.apply_rules(code, path, language=lang)
-                    if label == 'vulnerable':
-                        tp += 1 if findings else 0
-                        fn += 0 if findings else 1
-                    else:
-                        fp += 1 if findings else 0
-        precision = tp / (tp + fp) if (tp + fp) > 0 else 0.0
-        recall = tp / (tp + fn) if (tp + fn) > 0 else 0.0
-        f1 = (2 * precision * recall / (precision + recall)) if (precision + recall) > 0 else 0.0
-        return {
-            'total': total,
-            'tp': tp,
-            'fp': fp,
-            'fn': fn,
-            'precision': precision,
-            'recall': recall,
-            'f1': f1,
-            'threshold': threshold,
-            'strict': use_strict,
-        }
-
     if tune:
-        candidates = []
-        # Sweep thresholds and strict flag
-        for thr in [0.0, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8]:
-            for s in [False, True]:
-                res = run_eval(thr, s)
-                if res['precision'] >= min_precision and res['recall'] >= min_recall:
-                    candidates.append(res)
+        # Sweep thresholds and strict flag; each configuration is an
+        # independent CPU-bound eval, so farm the sweep out to a process
+        # pool and fall back to a serial loop where pools are unavailable
+        configs = [
+            (thr, s, tuple(selected_langs), bench)
+            for thr in [0.0, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8]
+            for s in (False, True)
+        ]
+        try:
+            with ProcessPoolExecutor(
+                max_workers=min(len(configs), os.cpu_count() or 1)
+            ) as executor:
+                sweep = list(executor.map(_bench_eval_config, configs))
+        except (OSError, ValueError):
+            sweep = [_bench_eval_config(config) for config in configs]
+        candidates = [
+            res for res in sweep
+            if res['precision'] >= min_precision and res['recall'] >= min_recall
+        ]
         if not candidates:
             console.print(Panel.fit("No configuration met the constraints", title="Benchmark", border_style="red"))
             return
@@ -289,7 +354,7 @@ def bench(language, manifest, min_confidence, strict, tune, min_precision, min_r
         return
 
     # Non-tuned single run
-    res = run_eval(min_confidence, strict)
+    res = _bench_eval_config((min_confidence, strict, tuple(selected_langs), bench))
     precision = res['precision']
     recall = res['recall']
     console.print(Panel.fit(
@@ -353,25 +418,24 @@ def version():
         title="About"
     ))
 
-if __name__ == '__main__':
-    # Allow `python cli.py <path_or_url>` without subcommand for local dev
-    args = sys.argv[1:]
-    known = {"scan", "rules", "version", "index", "bench", "--help", "-h", "--version"}
-    if args and not args[0].startswith('-') and args[0] not in known:
-        sys.argv.insert(1, 'scan')
-    cli()
+# ---------- Helpers ----------
+def _dumps_pretty(obj) -> bytes:
+    """Serialize one JSON value to indented bytes, preferring orjson."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str)
+    return json.dumps(obj, indent=2, default=str).encode('utf-8')
 
-# Console entrypoint that allows `prompt-scan <path_or_url>`
-def entry():
-    args = sys.argv[1:]
-    known = {"scan", "rules", "version", "index", "bench", "--help", "-h", "--version"}
-    if args and not args[0].startswith('-') and args[0] not in known:
-        sys.argv.insert(1, 'scan')
-    cli()
 
-# ---------- Helpers ----------
-def _serialize_scan_results_to_json(scan_data):
-    """Serialize scan results dict to pretty JSON string."""
+def _write_scan_results_json(scan_data, out=None):
+    """Stream scan results as JSON to a binary stream (default: stdout).
+
+    Results are serialized one ScanResult at a time, so the payload is never
+    materialized as one giant dict-plus-string pair, and writes go straight
+    to sys.stdout.buffer, bypassing Rich's markup and encoding layers.
+    """
+    if out is None:
+        out = sys.stdout.buffer
+
     summary = scan_data.get('summary')
     summary_dict = None
     if summary is not None:
@@ -385,24 +449,38 @@ def _serialize_scan_results_to_json(scan_data):
             'findings_by_language': summary.findings_by_language,
         }
 
-    results = []
+    out.write(b'{"scan_path": ' + _dumps_pretty(scan_data.get('scan_path')))
+    out.write(b',\n"scan_timestamp": ' + _dumps_pretty(scan_data.get('scan_timestamp')))
+    out.write(b',\n"summary": ' + _dumps_pretty(summary_dict))
+    out.write(b',\n"results": [')
+    first = True
     for r in scan_data.get('results', []):
-        results.append({
+        if not first:
+            out.write(b',')
+        out.write(b'\n' + _dumps_pretty({
             'file_path': str(r.file_path),
             'findings': r.findings,
-            'scan_time': r.scan_time,
+            'scan_time': r.scan_time_ns / 1e9,
             'file_size': r.file_size,
             'language': r.language,
-        })
-
-    payload = {
-        'scan_path': scan_data.get('scan_path'),
-        'scan_timestamp': scan_data.get('scan_timestamp'),
-        'summary': summary_dict,
-        'results': results,
-    }
-    return json.dumps(payload, indent=2)
-
+        }))
+        first = False
+    out.write(b'\n]}\n')
+    out.flush()
 
 
+if __name__ == '__main__':
+    # Allow `python cli.py <path_or_url>` without subcommand for local dev
+    args = sys.argv[1:]
+    known = {"scan", "rules", "version", "index", "bench", "--help", "-h", "--version"}
+    if args and not args[0].startswith('-') and args[0] not in known:
+        sys.argv.insert(1, 'scan')
+    cli()
 
+# Console entrypoint that allows `prompt-scan <path_or_url>`
+def entry():
+    args = sys.argv[1:]
+    known = {"scan", "rules", "version", "index", "bench", "--help", "-h", "--version"}
+    if args and not args[0].startswith('-') and args[0] not in known:
+        sys.argv.insert(1, 'scan')
+    cli()
@@ -5,17 +5,74 @@ This demonstrates best practices for preventing prompt injection attacks.
 
 import openai
 import re
+from functools import lru_cache
 from typing import List, Dict, Any
 
+try:
+    import ahocorasick  # optional: single-pass multi-phrase matching
+except Exception:
+    ahocorasick = None
+
 # Configuration
 openai.api_key = "your-api-key-here"
 
+# Compiled once at import: re's bounded pattern cache still costs a hash
+# lookup and wrapper call per use, and these run on every request. The
+# dangerous patterns are fused into one alternation so validation makes a
+# single pass instead of nine.
+_SANITIZE_RE = re.compile(r'[<>"\']')
+_DANGEROUS_RE = re.compile(
+    r'system:|user:|assistant:|role:|content:|'
+    r'ignore previous|forget everything|act as|you are now',
+    re.IGNORECASE,
+)
+_BAD_BYTES_TABLE = str.maketrans('', '', '\x00\x1a')
+
+# The dangerous patterns are all literal substrings, so when pyahocorasick
+# is available they compile into one automaton that matches every phrase in
+# a single linear walk over the input — O(n) regardless of phrase count,
+# and immune to ReDoS by construction.
+_DANGEROUS_PHRASES = (
+    'system:', 'user:', 'assistant:', 'role:', 'content:',
+    'ignore previous', 'forget everything', 'act as', 'you are now',
+)
+
+if ahocorasick is not None:
+    _DANGEROUS_AC = ahocorasick.Automaton()
+    for _phrase in _DANGEROUS_PHRASES:
+        _DANGEROUS_AC.add_word(_phrase, _phrase)
+    _DANGEROUS_AC.make_automaton()
+else:
+    _DANGEROUS_AC = None
+
+# Repeated prompts (chat retries, eval loops, common greetings) make
+# validation and sanitization collapse to a dict lookup; inputs longer
+# than this bypass the caches so memory stays bounded
+_CACHE_MAX_INPUT_LEN = 256
+
+
+def _sanitize(user_input: str) -> str:
+    # Limit length before any regex work so adversarially long inputs
+    # cost O(1) to truncate instead of a full pattern scan
+    if len(user_input) > 1000:
+        user_input = user_input[:1000]
+    return _SANITIZE_RE.sub('', user_input)
+
+
+_sanitize_cached = lru_cache(maxsize=4096)(_sanitize)
+
+
 def sanitize_input(user_input: str) -> str:
-    """Sanitize user input to prevent injection attacks."""
-    # Remove potentially dangerous characters and patterns
-    sanitized = re.sub(r'[<>"\']', '', user_input)
-    # Limit length
-    return sanitized[:1000]
+    """Sanitize user input to prevent injection attacks.
+
+    Short inputs are memoized; call sanitize_input.cache_clear() to reset.
+    """
+    if len(user_input) > _CACHE_MAX_INPUT_LEN:
+        return _sanitize(user_input)
+    return _sanitize_cached(user_input)
+
+
+sanitize_input.cache_clear = _sanitize_cached.cache_clear
 
 def secure_chat_completion(user_input: str) -> str:
     """✅ SECURE: Proper message structure with separated roles"""
@@ -127,35 +184,43 @@ def secure_parameterized_prompt(user_data: Dict[str, Any]) -> str:
     )
     return response.choices[0].message.content
 
-def secure_validation(user_input: str) -> bool:
-    """✅ SECURE: Input validation before processing"""
-    # Check for potentially malicious patterns
-    dangerous_patterns = [
-        r'system:',
-        r'user:',
-        r'assistant:',
-        r'role:',
-        r'content:',
-        r'ignore previous',
-        r'forget everything',
-        r'act as',
-        r'you are now',
-    ]
-    
-    for pattern in dangerous_patterns:
-        if re.search(pattern, user_input, re.IGNORECASE):
-            return False
-    
-    # Check length
+def _validate(user_input: str) -> bool:
+    # Check length first: oversized input is rejected in O(1) without ever
+    # reaching the pattern matchers
     if len(user_input) > 1000:
         return False
-    
-    # Check for null bytes or other dangerous characters
-    if '\x00' in user_input or '\x1a' in user_input:
+
+    # Check for potentially malicious patterns: one automaton walk when
+    # available, otherwise one fused regex alternation
+    if _DANGEROUS_AC is not None:
+        if next(_DANGEROUS_AC.iter(user_input.lower()), None) is not None:
+            return False
+    elif _DANGEROUS_RE.search(user_input):
         return False
-    
+
+    # Check for null bytes or other dangerous characters; translate drops
+    # them in one C-level pass instead of two substring scans
+    if len(user_input.translate(_BAD_BYTES_TABLE)) != len(user_input):
+        return False
+
     return True
 
+
+_validate_cached = lru_cache(maxsize=4096)(_validate)
+
+
+def secure_validation(user_input: str) -> bool:
+    """✅ SECURE: Input validation before processing
+
+    Short inputs are memoized; call secure_validation.cache_clear() to reset.
+    """
+    if len(user_input) > _CACHE_MAX_INPUT_LEN:
+        return _validate(user_input)
+    return _validate_cached(user_input)
+
+
+secure_validation.cache_clear = _validate_cached.cache_clear
+
 def secure_chat_with_validation(user_input: str) -> str:
     """✅ SECURE: Complete secure chat with validation"""
     # Validate input
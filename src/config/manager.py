@@ -2,11 +2,105 @@
 Configuration manager for the prompt injection scanner.
 """
 
+import copy
+import logging
 import yaml
 from pathlib import Path
 from typing import Dict, Any, Optional, List
 import os
 
+from ..utils.yaml_cache import load_yaml_cached
+
+logger = logging.getLogger(__name__)
+
+# Default configuration shared by every ConfigManager instance; treat as
+# immutable — instances deep-copy before handing it out or merging into it.
+_DEFAULT_CONFIG: Dict[str, Any] = {
+    'scanner': {
+        'max_file_size_mb': 10,
+        'parallel_workers': 4,
+        'use_cache': True,
+        'cache_ttl_hours': 1,
+        'verbose': False
+    },
+    'filters': {
+        'exclude_patterns': [
+            "node_modules/**",
+            "dist/**",
+            "build/**",
+            "__pycache__/**",
+            ".git/**",
+            "*.min.js",
+            "*.min.css",
+            "*.pyc",
+            "*.pyo",
+            ".DS_Store",
+            "Thumbs.db"
+        ],
+        'include_patterns': [],
+        'max_file_size_mb': 10,
+        'skip_binary_files': True
+    },
+    'rules': {
+        'enable_categories': [
+            "direct_injection",
+            "system_pollution", 
+            "template_injection",
+            "unsafe_formatting",
+            "hardcoded_prompts"
+        ],
+        'language_rules': {
+            'python': {'enabled': True, 'custom_patterns': [], 'severity_overrides': {}},
+            'javascript': {'enabled': True, 'custom_patterns': [], 'severity_overrides': {}},
+            'typescript': {'enabled': True, 'custom_patterns': [], 'severity_overrides': {}},
+            'java': {'enabled': True, 'custom_patterns': [], 'severity_overrides': {}},
+            'go': {'enabled': True, 'custom_patterns': [], 'severity_overrides': {}}
+        }
+    },
+    'severity': {
+        'critical': {'color': 'red', 'description': 'Critical vulnerabilities', 'enabled': True},
+        'high': {'color': 'bright_red', 'description': 'High-risk vulnerabilities', 'enabled': True},
+        'medium': {'color': 'yellow', 'description': 'Medium-risk vulnerabilities', 'enabled': True},
+        'low': {'color': 'blue', 'description': 'Low-risk findings', 'enabled': True},
+        'info': {'color': 'cyan', 'description': 'Informational findings', 'enabled': True}
+    },
+    'context_analysis': {
+        'enabled': True,
+        'safe_contexts': ['print statements', 'logging', 'debug statements', 'comments', 'docstrings'],
+        'dangerous_contexts': ['openai api calls', 'langchain calls', 'anthropic api calls', 'cohere api calls', 'http requests']
+    },
+    'reporting': {
+        'output_formats': ['cli', 'json', 'html', 'sarif'],
+        'cli': {
+            'show_confidence': True,
+            'show_context': True,
+            'color_output': True,
+            'progress_bars': True
+        },
+        'html': {
+            'template_path': 'templates/report.html',
+            'include_code_snippets': True,
+            'include_recommendations': True
+        },
+        'sarif': {
+            'include_help_uri': True,
+            'include_rule_help': True
+        }
+    },
+    'performance': {
+        'enable_ast_analysis': True,
+        'enable_context_analysis': True,
+        'enable_caching': True,
+        'cache_directory': '~/.prompt-scanner/cache',
+        'memory_optimization': {
+            'streaming_processing': False,
+            'chunk_size_mb': 1,
+            'max_memory_mb': 512
+        }
+    },
+    'custom_rules': []
+}
+
 
 class ConfigManager:
     """Manages configuration for the scanner."""
@@ -23,6 +117,8 @@ class ConfigManager:
         
         self.config_path = config_path
         self.config = self._load_config()
+        # Memoized dotted-key lookups; config is immutable between reload()s
+        self._get_cache: Dict[str, Any] = {}
     
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file."""
@@ -30,129 +126,54 @@ class ConfigManager:
             return self._get_default_config()
         
         try:
-            with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f)
+            config = load_yaml_cached(self.config_path)
+            if not config:
+                # Missing/empty user config: skip the merge round-trip
+                return self._get_default_config()
             return self._merge_with_defaults(config)
         except Exception as e:
-            print(f"Warning: Could not load config from {self.config_path}: {e}")
+            logger.warning("Could not load config from %s: %s", self.config_path, e)
             return self._get_default_config()
     
     def _get_default_config(self) -> Dict[str, Any]:
-        """Get default configuration."""
-        return {
-            'scanner': {
-                'max_file_size_mb': 10,
-                'parallel_workers': 4,
-                'use_cache': True,
-                'cache_ttl_hours': 1,
-                'verbose': False
-            },
-            'filters': {
-                'exclude_patterns': [
-                    "node_modules/**",
-                    "dist/**",
-                    "build/**",
-                    "__pycache__/**",
-                    ".git/**",
-                    "*.min.js",
-                    "*.min.css",
-                    "*.pyc",
-                    "*.pyo",
-                    ".DS_Store",
-                    "Thumbs.db"
-                ],
-                'include_patterns': [],
-                'max_file_size_mb': 10,
-                'skip_binary_files': True
-            },
-            'rules': {
-                'enable_categories': [
-                    "direct_injection",
-                    "system_pollution", 
-                    "template_injection",
-                    "unsafe_formatting",
-                    "hardcoded_prompts"
-                ],
-                'language_rules': {
-                    'python': {'enabled': True, 'custom_patterns': [], 'severity_overrides': {}},
-                    'javascript': {'enabled': True, 'custom_patterns': [], 'severity_overrides': {}},
-                    'typescript': {'enabled': True, 'custom_patterns': [], 'severity_overrides': {}},
-                    'java': {'enabled': True, 'custom_patterns': [], 'severity_overrides': {}},
-                    'go': {'enabled': True, 'custom_patterns': [], 'severity_overrides': {}}
-                }
-            },
-            'severity': {
-                'critical': {'color': 'red', 'description': 'Critical vulnerabilities', 'enabled': True},
-                'high': {'color': 'bright_red', 'description': 'High-risk vulnerabilities', 'enabled': True},
-                'medium': {'color': 'yellow', 'description': 'Medium-risk vulnerabilities', 'enabled': True},
-                'low': {'color': 'blue', 'description': 'Low-risk findings', 'enabled': True},
-                'info': {'color': 'cyan', 'description': 'Informational findings', 'enabled': True}
-            },
-            'context_analysis': {
-                'enabled': True,
-                'safe_contexts': ['print statements', 'logging', 'debug statements', 'comments', 'docstrings'],
-                'dangerous_contexts': ['openai api calls', 'langchain calls', 'anthropic api calls', 'cohere api calls', 'http requests']
-            },
-            'reporting': {
-                'output_formats': ['cli', 'json', 'html', 'sarif'],
-                'cli': {
-                    'show_confidence': True,
-                    'show_context': True,
-                    'color_output': True,
-                    'progress_bars': True
-                },
-                'html': {
-                    'template_path': 'templates/report.html',
-                    'include_code_snippets': True,
-                    'include_recommendations': True
-                },
-                'sarif': {
-                    'include_help_uri': True,
-                    'include_rule_help': True
-                }
-            },
-            'performance': {
-                'enable_ast_analysis': True,
-                'enable_context_analysis': True,
-                'enable_caching': True,
-                'cache_directory': '~/.prompt-scanner/cache',
-                'memory_optimization': {
-                    'streaming_processing': False,
-                    'chunk_size_mb': 1,
-                    'max_memory_mb': 512
-                }
-            },
-            'custom_rules': []
-        }
+        """Get a private copy of the default configuration."""
+        return copy.deepcopy(_DEFAULT_CONFIG)
     
     def _merge_with_defaults(self, config: Dict[str, Any]) -> Dict[str, Any]:
         """Merge user config with defaults."""
-        default_config = self._get_default_config()
-        return self._deep_merge(default_config, config)
+        # _deep_merge deep-copies its base, so no extra copy is needed here
+        return self._deep_merge(_DEFAULT_CONFIG, config)
     
     def _deep_merge(self, base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
-        """Deep merge two dictionaries."""
-        result = base.copy()
-        
-        for key, value in override.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._deep_merge(result[key], value)
-            else:
-                result[key] = value
-        
+        """Deep merge two dictionaries (iterative, single pre-copied root)."""
+        result = copy.deepcopy(base)
+        stack = [(result, override)]
+
+        while stack:
+            dst, src = stack.pop()
+            for key, value in src.items():
+                if isinstance(value, dict) and isinstance(dst.get(key), dict):
+                    stack.append((dst[key], value))
+                else:
+                    dst[key] = value
+
         return result
     
     def get(self, key: str, default: Any = None) -> Any:
         """Get a configuration value using dot notation."""
+        if key in self._get_cache:
+            return self._get_cache[key]
+
         keys = key.split('.')
         value = self.config
-        
+
         for k in keys:
             if isinstance(value, dict) and k in value:
                 value = value[k]
             else:
                 return default
-        
+
+        self._get_cache[key] = value
         return value
     
     def get_scanner_config(self) -> Dict[str, Any]:
@@ -189,22 +210,36 @@ class ConfigManager:
     
     def is_rule_enabled(self, rule_category: str) -> bool:
         """Check if a rule category is enabled."""
-        enabled_categories = self.get('rules.enable_categories', [])
-        return rule_category in enabled_categories
-    
+        cache_key = f'_enabled:rule:{rule_category}'
+        if cache_key not in self._get_cache:
+            enabled_categories = self.get('rules.enable_categories', [])
+            self._get_cache[cache_key] = rule_category in enabled_categories
+        return self._get_cache[cache_key]
+
     def is_language_enabled(self, language: str) -> bool:
         """Check if a language is enabled."""
-        language_rules = self.get('rules.language_rules', {})
-        if language in language_rules:
-            return language_rules[language].get('enabled', True)
-        return True
-    
-    def is_severity_enabled(self, severity: str) -> bool:
-        """Check if a severity level is enabled."""
-        severity_config = self.get('severity', {})
-        if severity in severity_config:
-            return severity_config[severity].get('enabled', True)
-        return True
+        cache_key = f'_enabled:language:{language}'
+        if cache_key not in self._get_cache:
+            language_rules = self.get('rules.language_rules', {})
+            if language in language_rules:
+                self._get_cache[cache_key] = language_rules[language].get('enabled', True)
+            else:
+                self._get_cache[cache_key] = True
+        return self._get_cache[cache_key]
+
+    def is_severity_enabled(self, severity) -> bool:
+        """Check if a severity level is enabled (accepts str or Severity enum)."""
+        name = getattr(severity, 'name', None)
+        if name is not None:
+            severity = name.lower()
+        cache_key = f'_enabled:severity:{severity}'
+        if cache_key not in self._get_cache:
+            severity_config = self.get('severity', {})
+            if severity in severity_config:
+                self._get_cache[cache_key] = severity_config[severity].get('enabled', True)
+            else:
+                self._get_cache[cache_key] = True
+        return self._get_cache[cache_key]
     
     def get_exclude_patterns(self) -> List[str]:
         """Get exclude patterns."""
@@ -249,6 +284,7 @@ class ConfigManager:
     def reload(self):
         """Reload configuration from file."""
         self.config = self._load_config()
+        self._get_cache.clear()
 
 
 
@@ -2,21 +2,42 @@
 CLI report generator for scan results.
 """
 
-from typing import List, Dict, Any, Optional
+from collections import defaultdict
+from dataclasses import replace
+from typing import ClassVar, List, Dict, Any, Optional, Tuple
 from pathlib import Path
-from rich.console import Console
+from rich.console import Console, Group
 from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
 from rich.syntax import Syntax
 from rich.progress import Progress
+from rich.live import Live
 from rich import box
 from rich.markup import escape
 
 
 class CLIReportGenerator:
     """Generates CLI-formatted reports for scan results."""
-    
+
+    # Shared display constants; per-finding styling is a dict lookup plus
+    # one f-string rather than a branch ladder rebuilt on every call
+    _SEVERITY_COLORS: ClassVar[Dict[str, str]] = {
+        'critical': 'red',
+        'high': 'bright_red',
+        'medium': 'yellow',
+        'low': 'blue',
+        'info': 'cyan'
+    }
+    _SEVERITY_ORDER: ClassVar[Tuple[str, ...]] = ('critical', 'high', 'medium', 'low', 'info')
+    _SEVERITY_TITLE: ClassVar[Dict[str, str]] = {
+        'critical': 'Critical',
+        'high': 'High',
+        'medium': 'Medium',
+        'low': 'Low',
+        'info': 'Info'
+    }
+
     def __init__(self):
         self.console = Console()
     
@@ -91,31 +112,12 @@ class CLIReportGenerator:
         table.add_column("Severity", style="bold")
         table.add_column("Count", justify="right")
         
-        severity_colors = {
-            'critical': 'red',
-            'high': 'bright_red',
-            'medium': 'yellow',
-            'low': 'blue',
-            'info': 'cyan'
-        }
-        
-        for severity in ['critical', 'high', 'medium', 'low', 'info']:
+        for severity in self._SEVERITY_ORDER:
             if severity in severity_counts:
-                color = severity_colors.get(severity, 'white')
-                if color == 'red':
-                    styled_severity = f"[red]{severity.title()}[/red]"
-                elif color == 'bright_red':
-                    styled_severity = f"[bright_red]{severity.title()}[/bright_red]"
-                elif color == 'yellow':
-                    styled_severity = f"[yellow]{severity.title()}[/yellow]"
-                elif color == 'blue':
-                    styled_severity = f"[blue]{severity.title()}[/blue]"
-                elif color == 'cyan':
-                    styled_severity = f"[cyan]{severity.title()}[/cyan]"
-                else:
-                    styled_severity = f"[white]{severity.title()}[/white]"
+                color = self._SEVERITY_COLORS.get(severity, 'white')
+                label = self._SEVERITY_TITLE.get(severity, severity.title())
                 table.add_row(
-                    styled_severity,
+                    f"[{color}]{label}[/{color}]",
                     str(severity_counts[severity])
                 )
         
@@ -140,18 +142,30 @@ class CLIReportGenerator:
         if not files_with_findings:
             return
         
-        self.console.print(Panel(
+        # Collect every renderable up front and draw in one pass: each
+        # console.print takes the console lock, re-measures the terminal
+        # and flushes, which dominates wall time on large reports
+        renderables: List[Any] = [Panel(
             f"Found [red]{sum(len(r.findings) for r in files_with_findings)}[/red] vulnerabilities across [blue]{len(files_with_findings)}[/blue] files",
             title="Vulnerabilities Found",
             border_style="red"
-        ))
-        
-        # Display findings by file
+        )]
+
         for result in files_with_findings:
-            self._display_file_findings(result, hide_code=hide_code, hide_context=hide_context)
+            self._collect_file_findings(renderables, result, hide_code=hide_code, hide_context=hide_context)
+
+        report = Group(*renderables)
+        if self.console.is_terminal:
+            # One Live update amortizes all terminal redraws into a single
+            # ANSI frame instead of one per panel
+            with Live(console=self.console, auto_refresh=False, transient=False) as live:
+                live.update(report)
+                live.refresh()
+        else:
+            self.console.print(report)
     
-    def _display_file_findings(self, result: Any, hide_code: bool = False, hide_context: bool = False):
-        """Display findings for a single file."""
+    def _collect_file_findings(self, renderables: List[Any], result: Any, hide_code: bool = False, hide_context: bool = False):
+        """Build the header and finding panels for a single file."""
         file_path = result.file_path
         findings = result.findings
         
@@ -159,35 +173,26 @@ class CLIReportGenerator:
             return
         
         # File header
-        self.console.print(f"\n[bold blue]📁 {escape(str(file_path))}[/bold blue]")
+        renderables.append(f"\n[bold blue]📁 {escape(str(file_path))}[/bold blue]")
         if result.language:
-            self.console.print(f"[dim]Language: {result.language}[/dim]")
+            renderables.append(f"[dim]Language: {result.language}[/dim]")
         
         # Group findings by severity
-        findings_by_severity = {}
+        findings_by_severity = defaultdict(list)
         for finding in findings:
-            severity = finding.get('severity', 'unknown')
-            if severity not in findings_by_severity:
-                findings_by_severity[severity] = []
-            findings_by_severity[severity].append(finding)
+            findings_by_severity[finding.get('severity', 'unknown')].append(finding)
         
-        # Display findings by severity
-        for severity in ['critical', 'high', 'medium', 'low', 'info']:
-            if severity in findings_by_severity:
-                self._display_severity_findings(severity, findings_by_severity[severity], hide_code=hide_code, hide_context=hide_context)
+        for severity in self._SEVERITY_ORDER:
+            bucket = findings_by_severity.get(severity)
+            if bucket:
+                self._collect_severity_findings(renderables, severity, bucket, hide_code=hide_code, hide_context=hide_context)
     
-    def _display_severity_findings(self, severity: str, findings: List[Dict[str, Any]], hide_code: bool = False, hide_context: bool = False):
-        """Display findings for a specific severity level."""
-        severity_colors = {
-            'critical': 'red',
-            'high': 'bright_red',
-            'medium': 'yellow',
-            'low': 'blue',
-            'info': 'cyan'
-        }
-        
-        color = severity_colors.get(severity, 'white')
-        
+    def _collect_severity_findings(self, renderables: List[Any], severity: str, findings: List[Dict[str, Any]], hide_code: bool = False, hide_context: bool = False):
+        """Build finding panels for a specific severity level."""
+        color = self._SEVERITY_COLORS.get(severity, 'white')
+        label = self._SEVERITY_TITLE.get(severity, severity.title())
+        title = f"[{color}]{label}[/{color}]"
+
         for finding in findings:
             # Create finding panel
             rule_id = finding.get('rule_id', 'Unknown')
@@ -201,31 +206,22 @@ class CLIReportGenerator:
             # Show 0-100 with 1-decimal resolution for realism
             confidence_text = f"Confidence: {confidence * 100:.1f}%"
             
-            content = f"[bold]{message}[/bold]\n"
-            content += f"Rule: [dim]{rule_id}[/dim]\n"
-            content += f"Line: [yellow]{line_number}[/yellow]\n"
-            content += f"{confidence_text}\n"
-            
+            parts = [
+                f"[bold]{message}[/bold]",
+                f"Rule: [dim]{rule_id}[/dim]",
+                f"Line: [yellow]{line_number}[/yellow]",
+                confidence_text,
+            ]
+
             if line_content and not hide_code:
-                content += f"Code: [white]{line_content}[/white]\n"
-            
+                parts.append(f"Code: [white]{line_content}[/white]")
+
             if context and not hide_context:
-                content += f"Context: [dim]{context}[/dim]"
+                parts.append(f"Context: [dim]{context}[/dim]")
+
+            content = "\n".join(parts)
             
             # Create panel
-            if color == 'red':
-                title = f"[red]{severity.title()}[/red]"
-            elif color == 'bright_red':
-                title = f"[bright_red]{severity.title()}[/bright_red]"
-            elif color == 'yellow':
-                title = f"[yellow]{severity.title()}[/yellow]"
-            elif color == 'blue':
-                title = f"[blue]{severity.title()}[/blue]"
-            elif color == 'cyan':
-                title = f"[cyan]{severity.title()}[/cyan]"
-            else:
-                title = f"[white]{severity.title()}[/white]"
-            
             panel = Panel(
                 content,
                 title=title,
@@ -233,29 +229,24 @@ class CLIReportGenerator:
                 padding=(0, 1)
             )
             
-            self.console.print(panel)
+            renderables.append(panel)
     
     def _filter_by_severity(self, results: List[Any], severity_filter: List[str]) -> List[Any]:
         """Filter results by severity level."""
+        sev_set = frozenset(severity_filter)
         filtered_results = []
-        
+
         for result in results:
             filtered_findings = [
                 finding for finding in result.findings
-                if finding.get('severity', 'unknown') in severity_filter
+                if finding.get('severity', 'unknown') in sev_set
             ]
-            
+
             if filtered_findings:
-                # Create a new result with filtered findings
-                filtered_result = type(result)(
-                    file_path=result.file_path,
-                    findings=filtered_findings,
-                    scan_time=result.scan_time,
-                    file_size=result.file_size,
-                    language=result.language
-                )
-                filtered_results.append(filtered_result)
-        
+                # Copy the result with only the findings list swapped out
+                # rather than reconstructing it field by field
+                filtered_results.append(replace(result, findings=filtered_findings))
+
         return filtered_results
     
     def display_recommendations(self):
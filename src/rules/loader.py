@@ -2,11 +2,68 @@
 Rule loader for YAML-based vulnerability detection rules.
 """
 
+import logging
 import yaml
 import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
+from enum import IntEnum
+
+from ..utils.yaml_cache import load_yaml_cached
+
+try:
+    import hyperscan  # optional: SIMD multi-pattern DFA, scans input once
+except Exception:
+    hyperscan = None
+
+# Constructs Hyperscan cannot compile (backreferences); such patterns stay on re
+_BACKREF_RE = re.compile(r'\\\d|\(\?P=')
+
+logger = logging.getLogger(__name__)
+
+# Process-wide compiled-regex cache so identical patterns across rule files
+# (common between language variants) share a single re.Pattern object
+_REGEX_CACHE: Dict[Tuple[str, int], re.Pattern] = {}
+
+
+def _compile_cached(pattern: str, flags: int = re.IGNORECASE) -> re.Pattern:
+    key = (pattern, flags)
+    compiled = _REGEX_CACHE.get(key)
+    if compiled is None:
+        compiled = re.compile(pattern, flags)
+        _REGEX_CACHE[key] = compiled
+    return compiled
+
+
+# Parsed rule sets shared across RuleLoader instances, keyed on
+# (path, mtime_ns, size) like the yaml_cache disk layer. Repeated
+# RuleLoader() constructions in one process (e.g. bench --tune) then reuse
+# the same RuleSet objects instead of re-parsing and re-compiling.
+_RULESET_CACHE: Dict[Tuple[str, int, int], "RuleSet"] = {}
+
+
+class Severity(IntEnum):
+    """Severity as an integer level so hot-path comparisons are C-level
+    int compares instead of repeated `.lower()` string allocations."""
+    INFO = 0
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+    CRITICAL = 4
+
+    @classmethod
+    def from_str(cls, value: str) -> "Severity":
+        try:
+            return cls[value.upper()]
+        except KeyError:
+            return cls.MEDIUM
+
+
+# Index position == int(Severity); used to map levels back to display names
+_SEVERITY_NAMES = ('info', 'low', 'medium', 'high', 'critical')
 
 
 @dataclass
@@ -26,6 +83,9 @@ class Rule:
     severity: str
     patterns: List[RulePattern]
     examples: Dict[str, List[str]]
+    # Integer mirror of `severity` for hot-path comparisons; the string field
+    # stays the public API
+    level: Severity = Severity.MEDIUM
 
 
 @dataclass
@@ -37,6 +97,12 @@ class RuleSet:
     rules: Dict[str, List[Rule]]
     context_analysis: Dict[str, List[str]]
     frameworks: List[Dict[str, Any]]
+    # Hyperscan database over all hyperscan-compatible patterns (None when the
+    # module is unavailable); match ids map back to the originating rule.
+    hs_database: Optional[Any] = None
+    hs_pattern_map: Dict[int, Tuple[Rule, RulePattern]] = field(default_factory=dict)
+    # Flattened view of all rules, built once at load time (immutable)
+    all_rules: Tuple[Rule, ...] = ()
 
 
 class RuleLoader:
@@ -59,26 +125,82 @@ class RuleLoader:
         
         self.rules_dir = rules_dir
         self.rule_sets: Dict[str, RuleSet] = {}
-        self._load_rules()
-    
-    def _load_rules(self):
-        """Load all rule files from the rules directory."""
+        # Defer YAML parsing until a language is actually requested; only the
+        # filenames are indexed at construction time.
+        self._language_to_path: Dict[str, Path] = {}
+        self._rule_id_index: Dict[str, Rule] = {}
+        self._stats_cache: Optional[Dict[str, Any]] = None
+        self._fully_loaded = False
+        self._index_rule_files()
+
+    def _index_rule_files(self):
+        """Index rule files by language (filename stem) without parsing them."""
         if not self.rules_dir.exists():
-            print(f"Warning: Rules directory {self.rules_dir} does not exist")
+            logger.warning("Rules directory %s does not exist", self.rules_dir)
             return
-        
+
         for rule_file in self.rules_dir.glob("*.yaml"):
-            try:
-                rule_set = self._load_rule_file(rule_file)
-                if rule_set:
-                    self.rule_sets[rule_set.language] = rule_set
-            except Exception as e:
-                print(f"Warning: Could not load rule file {rule_file}: {e}")
+            self._language_to_path[rule_file.stem] = rule_file
+
+    def _load_rules(self):
+        """Load all rule files from the rules directory.
+
+        Files are parsed concurrently: libyaml releases the GIL around file
+        I/O, so a small thread pool cuts cold-start roughly proportionally to
+        the rule-file count. Shared state is only written from this thread.
+        """
+        files = list(self._language_to_path.values())
+        if files:
+            with ThreadPoolExecutor(max_workers=min(8, len(files))) as executor:
+                for rule_set in executor.map(self._safe_load_rule_file, files):
+                    if rule_set:
+                        self.rule_sets[rule_set.language] = rule_set
+                        self._index_rule_ids(rule_set)
+        self._stats_cache = None
+        self._fully_loaded = True
+
+    def _safe_load_rule_file(self, rule_file: Path) -> Optional[RuleSet]:
+        """Load one rule file, logging instead of raising on failure."""
+        try:
+            return self._load_rule_file(rule_file)
+        except Exception as e:
+            logger.warning("Could not load rule file %s: %s", rule_file, e)
+            return None
+
+    def _load_language(self, language: str):
+        """Lazily load the rule file for a single language, if indexed."""
+        rule_file = self._language_to_path.get(language)
+        if rule_file is None:
+            return
+        try:
+            rule_set = self._load_rule_file(rule_file)
+            if rule_set:
+                self.rule_sets[rule_set.language] = rule_set
+                self._index_rule_ids(rule_set)
+                self._stats_cache = None
+        except Exception as e:
+            logger.warning("Could not load rule file %s: %s", rule_file, e)
+
+    def _index_rule_ids(self, rule_set: RuleSet):
+        """Index a rule set's rules by ID for O(1) lookup (first one wins)."""
+        for rules in rule_set.rules.values():
+            for rule in rules:
+                self._rule_id_index.setdefault(rule.id, rule)
     
     def _load_rule_file(self, rule_file: Path) -> Optional[RuleSet]:
         """Load a single rule file."""
-        with open(rule_file, 'r') as f:
-            data = yaml.safe_load(f)
+        try:
+            stat = rule_file.stat()
+            memo_key = (str(rule_file), stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            memo_key = None
+
+        if memo_key is not None:
+            cached = _RULESET_CACHE.get(memo_key)
+            if cached is not None:
+                return cached
+
+        data = load_yaml_cached(rule_file)
         
         if not data:
             return None
@@ -103,15 +225,66 @@ class RuleLoader:
         # Load frameworks
         frameworks = data.get('frameworks', [])
         
-        return RuleSet(
+        hs_database, hs_pattern_map = self._build_hyperscan_db(rules)
+
+        rule_set = RuleSet(
             language=language,
             version=version,
             description=description,
             rules=rules,
             context_analysis=context_analysis,
-            frameworks=frameworks
+            frameworks=frameworks,
+            hs_database=hs_database,
+            hs_pattern_map=hs_pattern_map,
+            all_rules=tuple(r for rule_list in rules.values() for r in rule_list)
         )
-    
+
+        if memo_key is not None:
+            _RULESET_CACHE[memo_key] = rule_set
+
+        return rule_set
+
+    def _build_hyperscan_db(
+        self, rules: Dict[str, List[Rule]]
+    ) -> Tuple[Optional[Any], Dict[int, Tuple[Rule, RulePattern]]]:
+        """Compile all compatible patterns into one Hyperscan database.
+
+        Hyperscan scans the input bytes once at DFA speed across every pattern
+        simultaneously. Patterns using backreferences are left out (the union
+        regex / per-pattern `re` objects remain the fallback for those), and
+        everything degrades to `re` when the hyperscan module is not installed.
+        """
+        if hyperscan is None:
+            return None, {}
+
+        expressions: List[bytes] = []
+        ids: List[int] = []
+        pattern_map: Dict[int, Tuple[Rule, RulePattern]] = {}
+        idx = 0
+        for rule_list in rules.values():
+            for rule in rule_list:
+                for pattern in rule.patterns:
+                    if _BACKREF_RE.search(pattern.pattern):
+                        continue
+                    expressions.append(pattern.pattern.encode())
+                    ids.append(idx)
+                    pattern_map[idx] = (rule, pattern)
+                    idx += 1
+
+        if not expressions:
+            return None, {}
+
+        try:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=expressions,
+                ids=ids,
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SOM_LEFTMOST] * len(expressions),
+            )
+            return db, pattern_map
+        except Exception:
+            return None, {}
+
     def _create_rule(self, rule_data: Dict[str, Any]) -> Optional[Rule]:
         """Create a Rule object from rule data."""
         rule_id = rule_data.get('id')
@@ -130,14 +303,14 @@ class RuleLoader:
             
             if pattern_str:
                 try:
-                    compiled_pattern = re.compile(pattern_str, re.IGNORECASE)
+                    compiled_pattern = _compile_cached(pattern_str)
                     patterns.append(RulePattern(
                         pattern=pattern_str,
                         message=message,
                         compiled=compiled_pattern
                     ))
                 except re.error as e:
-                    print(f"Warning: Invalid regex pattern in rule {rule_id}: {e}")
+                    logger.warning("Invalid regex pattern in rule %s: %s", rule_id, e)
         
         # Get examples
         examples = rule_data.get('examples', {})
@@ -148,40 +321,45 @@ class RuleLoader:
             description=description,
             severity=severity,
             patterns=patterns,
-            examples=examples
+            examples=examples,
+            level=Severity.from_str(severity)
         )
     
     def get_rule_set(self, language: str) -> Optional[RuleSet]:
         """Get rule set for a specific language."""
-        return self.rule_sets.get(language)
+        rule_set = self.rule_sets.get(language)
+        if rule_set is None and not self._fully_loaded:
+            self._load_language(language)
+            rule_set = self.rule_sets.get(language)
+        return rule_set
     
-    def get_rules_for_language(self, language: str, category: Optional[str] = None) -> List[Rule]:
-        """Get rules for a specific language and optionally category."""
+    def get_rules_for_language(self, language: str, category: Optional[str] = None) -> Sequence[Rule]:
+        """Get rules for a specific language and optionally category.
+
+        The returned sequence is shared loader state; callers that need to
+        mutate it should copy with list(...).
+        """
         rule_set = self.get_rule_set(language)
         if not rule_set:
             return []
-        
+
         if category:
             return rule_set.rules.get(category, [])
-        
-        # Return all rules
-        all_rules = []
-        for rules in rule_set.rules.values():
-            all_rules.extend(rules)
-        return all_rules
+
+        return rule_set.all_rules
     
     def get_rule_by_id(self, rule_id: str) -> Optional[Rule]:
         """Get a specific rule by ID."""
-        for rule_set in self.rule_sets.values():
-            for rules in rule_set.rules.values():
-                for rule in rules:
-                    if rule.id == rule_id:
-                        return rule
-        return None
+        rule = self._rule_id_index.get(rule_id)
+        if rule is None and not self._fully_loaded:
+            self._load_rules()
+            rule = self._rule_id_index.get(rule_id)
+        return rule
     
     def get_supported_languages(self) -> List[str]:
         """Get list of supported languages."""
-        return list(self.rule_sets.keys())
+        # Answerable from the filename index alone, no parsing needed
+        return list(self._language_to_path.keys())
     
     def get_rule_categories(self, language: str) -> List[str]:
         """Get rule categories for a language."""
@@ -193,69 +371,85 @@ class RuleLoader:
     def reload_rules(self):
         """Reload all rules from files."""
         self.rule_sets.clear()
+        self._language_to_path.clear()
+        self._rule_id_index.clear()
+        self._stats_cache = None
+        self._fully_loaded = False
+        self._index_rule_files()
         self._load_rules()
     
     def validate_rules(self) -> List[str]:
         """Validate all loaded rules and return any errors."""
+        if not self._fully_loaded:
+            self._load_rules()
         errors = []
-        
+
+        # Single O(N) pass: count IDs and check patterns in one traversal
+        id_counter: Counter = Counter()
+        locations: Dict[str, List[Tuple[str, str]]] = {}
         for language, rule_set in self.rule_sets.items():
             for category, rules in rule_set.rules.items():
                 for rule in rules:
-                    # Check for duplicate rule IDs
-                    if self._has_duplicate_rule_id(rule.id, language, category):
-                        errors.append(f"Duplicate rule ID {rule.id} in {language}/{category}")
-                    
-                    # Validate patterns
+                    id_counter[rule.id] += 1
+                    locations.setdefault(rule.id, []).append((language, category))
+
+                    # Patterns were already compiled at load time; a missing
+                    # compiled object means compilation failed back then
                     for pattern in rule.patterns:
-                        try:
-                            re.compile(pattern.pattern)
-                        except re.error as e:
-                            errors.append(f"Invalid pattern in rule {rule.id}: {e}")
-        
+                        if pattern.compiled is None:
+                            errors.append(f"Invalid pattern in rule {rule.id}: {pattern.pattern}")
+
+        errors.extend(
+            f"Duplicate rule ID {rid} in {locations[rid]}"
+            for rid, count in id_counter.items() if count > 1
+        )
+
         return errors
     
-    def _has_duplicate_rule_id(self, rule_id: str, language: str, category: str) -> bool:
-        """Check if a rule ID is duplicated."""
-        count = 0
-        for lang, rule_set in self.rule_sets.items():
-            for cat, rules in rule_set.rules.items():
-                for rule in rules:
-                    if rule.id == rule_id:
-                        count += 1
-                        if count > 1:
-                            return True
-        return False
-    
     def get_rule_statistics(self) -> Dict[str, Any]:
-        """Get statistics about loaded rules."""
+        """Get statistics about loaded rules (computed once, cached)."""
+        if not self._fully_loaded:
+            self._load_rules()
+        if self._stats_cache is None:
+            self._stats_cache = self._compute_stats()
+        return self._stats_cache
+
+    def _compute_stats(self) -> Dict[str, Any]:
+        """Build the statistics dict from the loaded rule sets."""
         stats = {
             'total_languages': len(self.rule_sets),
             'languages': {},
             'total_rules': 0,
             'rules_by_severity': {'critical': 0, 'high': 0, 'medium': 0, 'low': 0, 'info': 0}
         }
-        
+        total_counts = [0] * len(_SEVERITY_NAMES)
+
         for language, rule_set in self.rule_sets.items():
-            language_stats = {
-                'categories': len(rule_set.rules),
-                'total_rules': 0,
-                'rules_by_severity': {'critical': 0, 'high': 0, 'medium': 0, 'low': 0, 'info': 0}
-            }
-            
+            # Count via integer severity levels; strings only at the edges
+            lang_counts = [0] * len(_SEVERITY_NAMES)
+            lang_total = 0
+
             for rules in rule_set.rules.values():
-                language_stats['total_rules'] += len(rules)
-                stats['total_rules'] += len(rules)
-                
+                lang_total += len(rules)
                 for rule in rules:
-                    severity = rule.severity.lower()
-                    if severity in language_stats['rules_by_severity']:
-                        language_stats['rules_by_severity'][severity] += 1
-                    if severity in stats['rules_by_severity']:
-                        stats['rules_by_severity'][severity] += 1
-            
-            stats['languages'][language] = language_stats
-        
+                    lang_counts[rule.level] += 1
+                    total_counts[rule.level] += 1
+
+            stats['total_rules'] += lang_total
+            stats['languages'][language] = {
+                'categories': len(rule_set.rules),
+                'total_rules': lang_total,
+                'rules_by_severity': {
+                    name: lang_counts[level]
+                    for level, name in enumerate(_SEVERITY_NAMES)
+                }
+            }
+
+        stats['rules_by_severity'] = {
+            name: total_counts[level]
+            for level, name in enumerate(_SEVERITY_NAMES)
+        }
+
         return stats
 
 
@@ -5,9 +5,76 @@ Context analyzer for distinguishing between vulnerable and safe code patterns.
 
 import re
 import hashlib
+from bisect import bisect_right
+from functools import lru_cache
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
+try:
+    import hyperscan  # optional multi-pattern DFA used as a prefilter
+except Exception:
+    hyperscan = None
+
+# Constructs Hyperscan cannot compile (backreferences, lookarounds)
+_HS_UNSUPPORTED_RE = re.compile(r'\\\d|\(\?P=|\(\?[=!<]')
+
+# Suffixes that short-circuit analyze_context to a floor score
+_DOC_DATA_SUFFIXES = frozenset({'.md', '.markdown', '.txt', '.csv', '.tsv'})
+
+# LLM API usage markers for the proximity heuristic in analyze_context
+_LLM_PATTERNS = (
+    r'openai\.', r'langchain', r'anthropic\.', r'gemini\.', r'groq\.', r'cohere\.',
+    r'chat\.?completions?\.?create', r'Completion\.create', r'ChatCompletion\.create',
+    r'messages\s*[:=]',
+)
+
+
+@lru_cache(maxsize=None)
+def _hs_db(patterns: Tuple[str, ...]) -> Optional[Any]:
+    """Compile a pattern set into a Hyperscan database, or None.
+
+    Only built when every pattern in the set is Hyperscan-compatible;
+    these are boolean any-match checks, so partial coverage would need
+    the union regex anyway.
+    """
+    if hyperscan is None or any(_HS_UNSUPPORTED_RE.search(p) for p in patterns):
+        return None
+    try:
+        db = hyperscan.Database()
+        expressions = [p.encode('utf-8') for p in patterns]
+        flags = [hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_ALLOWEMPTY
+                 | hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns)
+        db.compile(expressions=expressions, ids=list(range(len(patterns))), flags=flags)
+        return db
+    except Exception:
+        return None
+
+
+def _hs_any(db: Any, text: str) -> bool:
+    """True when any pattern in the database matches text."""
+    hits: List[int] = []
+
+    def on_match(pat_id, start, end, flags, ctx):
+        hits.append(pat_id)
+        return 1  # halt the scan at the first match
+
+    try:
+        db.scan(text.encode('utf-8', errors='ignore'), match_event_handler=on_match)
+    except Exception:
+        pass  # scan termination surfaces as an exception in some bindings
+    return bool(hits)
+
+
+@lru_cache(maxsize=None)
+def _union(patterns: Tuple[str, ...]) -> "re.Pattern[str]":
+    """Compile a pattern list into one alternation, shared across instances.
+
+    Every RuleEngine (and each spawned pool worker building one) creates a
+    ContextAnalyzer; memoizing on the pattern tuple makes the compile a
+    process-wide one-time cost.
+    """
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+
 
 class ContextAnalyzer:
     """Analyzes code context to determine if patterns are actually vulnerable."""
@@ -61,19 +128,88 @@ class ContextAnalyzer:
             ]
         }
         
+        # Specific per-finding patterns (checked against the matched line
+        # itself rather than the surrounding context)
+        self.safe_patterns = {
+            'python': [
+                r'print\s*\([^)]*\)',  # print statements
+                r'logging\.[a-z]+\s*\([^)]*\)',  # logging
+                r'debug\s*\([^)]*\)',  # debug
+                r'#.*',  # comments
+                r'"""[\s\S]*"""',  # docstrings
+                r"'''[\s\S]*'''",  # docstrings
+                # CUDA device selection
+                r"\.to\(f?'cuda:\\{[A-Za-z0-9_]+\\}'\)",
+                r"device\s*=\s*f?'cuda:\\{[A-Za-z0-9_]+\\}'",
+            ],
+            'javascript': [
+                r'console\.(log|error|warn)\s*\([^)]*\)',  # console
+                r'//.*',  # comments
+                r'/\*[\s\S]*\*/',  # block comments
+                # UI-focused template literals
+                r'className\s*=\s*`[\s\S]*`',
+                r'style\s*=\s*\{\s*\{[\s\S]*`[\s\S]*`[\s\S]*\}\s*\}',
+                r'addDebug(Log|Info)\s*\([^)]*`[\s\S]*`[^)]*\)',
+                r'setMessage\s*\([^)]*`[\s\S]*`[^)]*\)',
+                r'console\.[a-z]+\s*\([^)]*`[\s\S]*`[^)]*\)',
+            ]
+        }
+
+        self.dangerous_patterns = {
+            'python': [
+                r'openai\.[a-zA-Z]+\.[a-zA-Z]+\s*\([^)]*\)',  # OpenAI API calls
+                r'langchain\.[a-zA-Z]+\s*\([^)]*\)',  # LangChain calls
+                r'prompt\s*[=+]\s*[^+]*\+',  # prompt concatenation
+                r'messages\s*=\s*\[[^\]]*\{[^}]*content[^}]*\{[^}]*\}[^}]*\}[^\]]*\]',  # messages with user input
+                r'\beval\s*\(', r'\bexec\s*\('  # explicit dangerous execution
+            ],
+            'javascript': [
+                r'openai\.[a-zA-Z]+\.[a-zA-Z]+\s*\([^)]*\)',  # OpenAI API calls
+                r'messages\s*:\s*\[[^\]]*\{[^}]*content[^}]*\{[^}]*\}[^}]*\}[^\]]*\]',  # messages with user input
+                r'prompt\s*[=+]\s*[^+]*\+',  # prompt concatenation
+                r'\beval\s*\(',  # JS eval
+            ]
+        }
+
         # Compile patterns for performance
         self._compile_patterns()
+
+        # Last-file line split, shared across that file's findings
+        self._lines_key: Optional[str] = None
+        self._lines: List[str] = []
+        # Per-file memos: duplicate findings on a line score identically
+        # (the jitter is deterministic), and LLM proximity depends only on
+        # the line number within a file
+        self._ctx_memo: Dict[Tuple[Optional[str], int, str, Optional[str]], Tuple[float, str]] = {}
+        self._dist_memo: Dict[int, Optional[int]] = {}
     
     def _compile_patterns(self):
-        """Compile regex patterns for performance."""
-        self.compiled_safe = {}
-        self.compiled_dangerous = {}
-        
-        for lang, patterns in self.safe_contexts.items():
-            self.compiled_safe[lang] = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
-        
-        for lang, patterns in self.dangerous_contexts.items():
-            self.compiled_dangerous[lang] = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+        """Compile each pattern list into a single union regex.
+
+        One alternation search replaces N sequential scans of the same
+        string; the engine shares the pass across branches.
+        """
+        self.compiled_safe = {lang: _union(tuple(p)) for lang, p in self.safe_contexts.items()}
+        self.compiled_dangerous = {lang: _union(tuple(p)) for lang, p in self.dangerous_contexts.items()}
+        self.compiled_safe_local = {lang: _union(tuple(p)) for lang, p in self.safe_patterns.items()}
+        self.compiled_dangerous_local = {lang: _union(tuple(p)) for lang, p in self.dangerous_patterns.items()}
+
+        # With Hyperscan present, each set additionally compiles to a DFA
+        # that checks all alternatives in one C-level pass; the union regex
+        # stays as the fallback
+        self._hs_safe = {lang: _hs_db(tuple(p)) for lang, p in self.safe_contexts.items()}
+        self._hs_dangerous = {lang: _hs_db(tuple(p)) for lang, p in self.dangerous_contexts.items()}
+        self._hs_safe_local = {lang: _hs_db(tuple(p)) for lang, p in self.safe_patterns.items()}
+        self._hs_dangerous_local = {lang: _hs_db(tuple(p)) for lang, p in self.dangerous_patterns.items()}
+
+        self.compiled_llm = _union(_LLM_PATTERNS)
+
+        # Languages any context check can say something about; everything
+        # else (md, txt, json, ...) short-circuits before regex dispatch
+        self._supported_langs = (
+            frozenset(self.compiled_safe) | frozenset(self.compiled_dangerous)
+            | frozenset(self.compiled_safe_local) | frozenset(self.compiled_dangerous_local)
+        )
     
     def analyze_context(self, content: str, file_path: Path, language: Optional[str], 
                        line_number: int, context: str, base_severity: Optional[str] = None) -> Tuple[float, str]:
@@ -90,11 +226,24 @@ class ContextAnalyzer:
         Returns:
             Tuple of (confidence_score in [0,1], reason)
         """
+        # Doc/data files are almost always instructional noise; exit with
+        # a floor score before any regex work (the dominant population in
+        # real repos is exactly these files)
+        suffix = file_path.suffix.lower()
+        if suffix in _DOC_DATA_SUFFIXES and language not in self._supported_langs:
+            return 0.05, "doc/data file early exit"
+
         if not language:
             return 0.6, "Unknown language, slight positive prior"
         
-        # Get surrounding context (lines before and after)
-        lines = content.split('\n')
+        # Get surrounding context (lines before and after); the split also
+        # rolls the per-file memos over on a new content string
+        lines = self._split_lines(content)
+
+        memo_key = (language, line_number, context, base_severity)
+        cached = self._ctx_memo.get(memo_key)
+        if cached is not None:
+            return cached
         start_line = max(0, line_number - 3)
         end_line = min(len(lines), line_number + 3)
         surrounding_context = '\n'.join(lines[start_line:end_line])
@@ -134,14 +283,7 @@ class ContextAnalyzer:
             score -= 0.2
             reasons.append("safe pattern")
         
-        # Heuristics by path or extension (markdown/text and data tend to be instructional)
-        suffix = file_path.suffix.lower()
-        if suffix in {'.md', '.markdown', '.txt'}:
-            score -= 0.2
-            reasons.append("documentation file")
-        if suffix in {'.csv', '.tsv'}:
-            score -= 0.3
-            reasons.append("data file")
+        # Heuristics by path (doc/data suffixes already exited above)
         if any(part in {"examples", "docs", "tests", "test", "samples"} for part in file_path.parts):
             score -= 0.3
             reasons.append("examples/docs/tests path")
@@ -163,11 +305,11 @@ class ContextAnalyzer:
                 reasons.append("non-user variable")
         
         # LLM usage proximity heuristic: distance to LLM API usage
-        llm_patterns = [
-            r'openai\.', r'langchain', r'anthropic\.', r'gemini\.', r'groq\.', r'cohere\.',
-            r'chat\.?completions?\.?create', r'Completion\.create', r'ChatCompletion\.create', r'messages\s*[:=]'
-        ]
-        distance = self._distance_to_any_pattern(lines, line_number, llm_patterns)
+        if line_number in self._dist_memo:
+            distance = self._dist_memo[line_number]
+        else:
+            distance = self._distance_to_any_pattern(lines, line_number, self.compiled_llm)
+            self._dist_memo[line_number] = distance
         if distance is not None:
             if distance <= 3:
                 score += 0.25; reasons.append("llm proximity:<=3")
@@ -201,101 +343,88 @@ class ContextAnalyzer:
         # Clamp score
         score = max(0.0, min(1.0, score))
         reason = ", ".join(reasons) if reasons else "neutral"
+        self._ctx_memo[memo_key] = (score, reason)
         return score, reason
 
-    def _distance_to_any_pattern(self, lines: List[str], line_number: int, patterns: List[str]) -> Optional[int]:
-        """Return the distance in lines to the closest match of any pattern within ±50 lines.
+    def _split_lines(self, content: str) -> List[str]:
+        """Split content into lines once per file.
+
+        The rule engine scores every finding in a file against the same
+        content string, so the split is keyed on object identity — the
+        held reference keeps the key valid until the next file arrives.
+        """
+        if self._lines_key is not content:
+            self._lines_key = content
+            self._lines = content.split('\n')
+            self._ctx_memo = {}
+            self._dist_memo = {}
+        return self._lines
+
+    def _distance_to_any_pattern(self, lines: List[str], line_number: int,
+                                  pattern: "re.Pattern[str]") -> Optional[int]:
+        """Return the distance in lines to the closest match of the pattern within ±50 lines.
 
         If none found, return None.
         """
         window_before = max(0, line_number - 50)
         window_after = min(len(lines), line_number + 50)
-        compiled = [re.compile(p, re.IGNORECASE) for p in patterns]
+        window = lines[window_before:window_after]
+
+        # One pass over the joined window instead of a search per line;
+        # match offsets map back to lines via bisect on the start offsets
+        starts = [0]
+        for line in window[:-1]:
+            starts.append(starts[-1] + len(line) + 1)
+
         nearest: Optional[int] = None
-        for idx in range(window_before, window_after):
-            text = lines[idx]
-            if any(c.search(text) for c in compiled):
-                dist = abs(idx + 1 - line_number)
-                if nearest is None or dist < nearest:
-                    nearest = dist
+        for match in pattern.finditer('\n'.join(window)):
+            idx = bisect_right(starts, match.start()) - 1
+            dist = abs(window_before + idx + 1 - line_number)
+            if nearest is None or dist < nearest:
+                nearest = dist
+                if dist == 0:
+                    break
         return nearest
     
     def _is_in_dangerous_context(self, context: str, language: str) -> bool:
         """Check if the context is in a dangerous area."""
-        if language not in self.compiled_dangerous:
+        if language not in self._supported_langs:
             return False
-        
-        for pattern in self.compiled_dangerous[language]:
-            if pattern.search(context):
-                return True
-        return False
+        db = self._hs_dangerous.get(language)
+        if db is not None:
+            return _hs_any(db, context)
+        pattern = self.compiled_dangerous.get(language)
+        return bool(pattern and pattern.search(context))
     
     def _is_in_safe_context(self, context: str, language: str) -> bool:
         """Check if the context is in a safe area."""
-        if language not in self.compiled_safe:
+        if language not in self._supported_langs:
             return False
-        
-        for pattern in self.compiled_safe[language]:
-            if pattern.search(context):
-                return True
-        return False
+        db = self._hs_safe.get(language)
+        if db is not None:
+            return _hs_any(db, context)
+        pattern = self.compiled_safe.get(language)
+        return bool(pattern and pattern.search(context))
     
     def _is_safe_pattern(self, context: str, language: str) -> bool:
         """Check for specific safe patterns."""
-        safe_patterns = {
-            'python': [
-                r'print\s*\([^)]*\)',  # print statements
-                r'logging\.[a-z]+\s*\([^)]*\)',  # logging
-                r'debug\s*\([^)]*\)',  # debug
-                r'#.*',  # comments
-                r'"""[\s\S]*"""',  # docstrings
-                r"'''[\s\S]*'''",  # docstrings
-                # CUDA device selection
-                r"\.to\(f?'cuda:\\{[A-Za-z0-9_]+\\}'\)",
-                r"device\s*=\s*f?'cuda:\\{[A-Za-z0-9_]+\\}'",
-            ],
-            'javascript': [
-                r'console\.(log|error|warn)\s*\([^)]*\)',  # console
-                r'//.*',  # comments
-                r'/\*[\s\S]*\*/',  # block comments
-                # UI-focused template literals
-                r'className\s*=\s*`[\s\S]*`',
-                r'style\s*=\s*\{\s*\{[\s\S]*`[\s\S]*`[\s\S]*\}\s*\}',
-                r'addDebug(Log|Info)\s*\([^)]*`[\s\S]*`[^)]*\)',
-                r'setMessage\s*\([^)]*`[\s\S]*`[^)]*\)',
-                r'console\.[a-z]+\s*\([^)]*`[\s\S]*`[^)]*\)',
-            ]
-        }
-        
-        if language in safe_patterns:
-            for pattern in safe_patterns[language]:
-                if re.search(pattern, context, re.IGNORECASE):
-                    return True
-        return False
+        if language not in self._supported_langs:
+            return False
+        db = self._hs_safe_local.get(language)
+        if db is not None:
+            return _hs_any(db, context)
+        pattern = self.compiled_safe_local.get(language)
+        return bool(pattern and pattern.search(context))
     
     def _is_dangerous_pattern(self, context: str, language: str) -> bool:
         """Check for specific dangerous patterns."""
-        dangerous_patterns = {
-            'python': [
-                r'openai\.[a-zA-Z]+\.[a-zA-Z]+\s*\([^)]*\)',  # OpenAI API calls
-                r'langchain\.[a-zA-Z]+\s*\([^)]*\)',  # LangChain calls
-                r'prompt\s*[=+]\s*[^+]*\+',  # prompt concatenation
-                r'messages\s*=\s*\[[^\]]*\{[^}]*content[^}]*\{[^}]*\}[^}]*\}[^\]]*\]',  # messages with user input
-                r'\beval\s*\(', r'\bexec\s*\('  # explicit dangerous execution
-            ],
-            'javascript': [
-                r'openai\.[a-zA-Z]+\.[a-zA-Z]+\s*\([^)]*\)',  # OpenAI API calls
-                r'messages\s*:\s*\[[^\]]*\{[^}]*content[^}]*\{[^}]*\}[^}]*\}[^\]]*\]',  # messages with user input
-                r'prompt\s*[=+]\s*[^+]*\+',  # prompt concatenation
-                r'\beval\s*\(',  # JS eval
-            ]
-        }
-        
-        if language in dangerous_patterns:
-            for pattern in dangerous_patterns[language]:
-                if re.search(pattern, context, re.IGNORECASE):
-                    return True
-        return False
+        if language not in self._supported_langs:
+            return False
+        db = self._hs_dangerous_local.get(language)
+        if db is not None:
+            return _hs_any(db, context)
+        pattern = self.compiled_dangerous_local.get(language)
+        return bool(pattern and pattern.search(context))
     
     def _extract_variables(self, context: str, language: Optional[str]) -> list[str]:
         """Extract variable names from template contexts for simple heuristics."""
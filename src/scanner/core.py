@@ -2,10 +2,18 @@
 Core scanning engine for prompt injection detection.
 """
 
+import asyncio
+import multiprocessing
+import os
+import queue
+import sys
+import threading
 import time
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import itertools
+from collections import Counter
+from concurrent.futures import BrokenExecutor, FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 
 from .file_processor import FileProcessor
@@ -15,17 +23,94 @@ from ..utils.file_utils import get_scannable_files
 from ..config.manager import ConfigManager
 
 
-@dataclass
+# Repos below this size do not amortize the prefetcher thread's overhead
+_PREFETCH_MIN_FILES = 32
+
+
+def _prefetch_files(files: List[Path], window_sem: threading.Semaphore, stop_event: threading.Event):
+    """Issue POSIX_FADV_WILLNEED for upcoming files in a sliding window.
+
+    The consumer releases one semaphore permit per completed file, so the
+    prefetcher stays a bounded number of files ahead and the kernel can
+    coalesce the scan into large sequential block reads.
+    """
+    for file in files:
+        window_sem.acquire()
+        if stop_event.is_set():
+            return
+        try:
+            fd = os.open(str(file), os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
+# Per-worker-process scanning state. Under a fork start method the parent
+# points these at its own engine/processor before creating the pool, so
+# workers inherit the compiled regex state copy-on-write and never compile
+# at all; under spawn, _init_worker builds them once per worker instead of
+# once per task.
+_WORKER_ENGINE: Optional[RuleEngine] = None
+_WORKER_PROCESSOR: Optional[FileProcessor] = None
+
+
+def _init_worker(min_confidence: float, strict: bool, max_file_size: int):
+    """Initialize per-process scanning state for a spawn-based pool."""
+    global _WORKER_ENGINE, _WORKER_PROCESSOR
+    _WORKER_ENGINE = RuleEngine()
+    _WORKER_ENGINE.min_confidence_threshold = min_confidence
+    _WORKER_ENGINE.strict = strict
+    _WORKER_PROCESSOR = FileProcessor(max_file_size=max_file_size)
+
+
+def _scan_one(file_path: Path) -> Optional["ScanResult"]:
+    """Scan a single file in a worker process.
+
+    Cache lookups/writes happen in the parent; workers only read and match.
+    Returns None when the file is skipped or unreadable.
+    """
+    try:
+        content = _WORKER_PROCESSOR.read_file(file_path)
+        if content is None:
+            return None
+
+        language = _WORKER_PROCESSOR.detect_language(file_path, content)
+
+        t0 = time.perf_counter_ns()
+        findings = _WORKER_ENGINE.apply_rules(content, file_path, language)
+        scan_time_ns = time.perf_counter_ns() - t0
+
+        return ScanResult(
+            file_path=file_path,
+            findings=findings,
+            scan_time_ns=scan_time_ns,
+            file_size=len(content),
+            language=language
+        )
+    except Exception:
+        return None
+
+
+@dataclass(slots=True)
 class ScanResult:
-    """Result of a single file scan."""
+    """Result of a single file scan.
+
+    scan_time_ns is a monotonic perf_counter_ns delta; serializers divide by
+    1e9 once to keep the wire format in seconds.
+    """
     file_path: Path
     findings: List[Dict[str, Any]]
-    scan_time: float
+    scan_time_ns: int
     file_size: int
     language: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ScanSummary:
     """Summary of the entire scan."""
     total_files: int
@@ -65,7 +150,43 @@ class PromptScanner:
         self.cache = ScanCache(
             ttl=self.config.get_cache_ttl_hours() * 3600
         ) if self.use_cache else None
-        
+
+        # Verbose output goes through a bounded queue drained by a single
+        # daemon thread, so error bursts under the pool never serialize
+        # workers on the stdio lock
+        self._log_queue: "queue.Queue[str]" = queue.Queue(maxsize=1024)
+        self._log_thread: Optional[threading.Thread] = None
+
+        # Progress counters for callers that want to display them. Every
+        # completion is recorded on the parent side, so plain ints suffice;
+        # the CLI samples these on a timer instead of being called per file
+        self.files_total = 0
+        self.files_done = 0
+
+    def _log(self, message: str) -> None:
+        """Queue a verbose message for the background drain (dropped when full)."""
+        if not self.verbose:
+            return
+        if self._log_thread is None:
+            self._log_thread = threading.Thread(target=self._drain_log_queue, daemon=True)
+            self._log_thread.start()
+        try:
+            self._log_queue.put_nowait(message)
+        except queue.Full:
+            pass
+
+    def _drain_log_queue(self) -> None:
+        """Write queued messages to stderr in batches every 50ms."""
+        while True:
+            lines = [self._log_queue.get()]
+            time.sleep(0.05)
+            while True:
+                try:
+                    lines.append(self._log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            sys.stderr.write('\n'.join(lines) + '\n')
+
     def scan(self, path: Path) -> Dict[str, Any]:
         """
         Scan a directory for prompt injection vulnerabilities.
@@ -76,28 +197,52 @@ class PromptScanner:
         Returns:
             Dictionary containing scan results and summary
         """
-        start_time = time.time()
-        
-        if self.verbose:
-            print(f"Starting scan of: {path}")
+        start_ns = time.perf_counter_ns()
+
+        self._log(f"Starting scan of: {path}")
         
         # Get all scannable files
         files = get_scannable_files(path, self.exclude_patterns)
         
-        if self.verbose:
-            print(f"Found {len(files)} files to scan")
+        self._log(f"Found {len(files)} files to scan")
         
-        # Scan files (with caching if enabled)
-        results = []
+        # Resolve cache hits for the whole file list in one batch up front;
+        # only misses go through the prefetcher and the executors
+        cached = self.cache.get_many(files) if self.cache else {}
+        results = list(cached.values())
+        pending = [f for f in files if f not in cached]
         skipped_files = 0
-        
-        if self.parallel_workers > 1:
-            results, skipped_files = self._scan_parallel(files)
-        else:
-            results, skipped_files = self._scan_sequential(files)
+
+        self.files_total = len(files)
+        self.files_done = len(cached)
+
+        # Warm the page cache a bounded window ahead of the scan
+        prefetch_sem = None
+        prefetch_stop = None
+        prefetcher = None
+        if len(pending) >= _PREFETCH_MIN_FILES and hasattr(os, 'posix_fadvise'):
+            prefetch_sem = threading.Semaphore(2 * self.parallel_workers)
+            prefetch_stop = threading.Event()
+            prefetcher = threading.Thread(
+                target=_prefetch_files,
+                args=(pending, prefetch_sem, prefetch_stop),
+                daemon=True,
+            )
+            prefetcher.start()
+
+        try:
+            if self.parallel_workers > 1:
+                scanned, skipped_files = self._scan_parallel(pending, prefetch_sem)
+            else:
+                scanned, skipped_files = self._scan_sequential(pending, prefetch_sem)
+            results.extend(scanned)
+        finally:
+            if prefetcher is not None:
+                prefetch_stop.set()
+                prefetch_sem.release()
         
         # Generate summary
-        summary = self._generate_summary(results, time.time() - start_time, total_files=len(files), skipped_files=skipped_files)
+        summary = self._generate_summary(results, (time.perf_counter_ns() - start_ns) / 1e9, total_files=len(files), skipped_files=skipped_files)
         
         return {
             'results': results,
@@ -106,45 +251,190 @@ class PromptScanner:
             'scan_timestamp': time.time()
         }
     
-    def _scan_parallel(self, files: List[Path]) -> tuple[List[ScanResult], int]:
-        """Scan files using parallel workers.
+    async def scan_async(self, path: Path) -> Dict[str, Any]:
+        """
+        Async variant of scan() for event-loop callers (e.g. the API handler).
+
+        Per-file work runs via asyncio.to_thread in cpu_count-sized batches so
+        the GIL releases around open()/read() syscalls while regex matching
+        stays inside the worker threads.
+
+        Args:
+            path: Path to the directory to scan
+
+        Returns:
+            Dictionary containing scan results and summary
+        """
+        start_ns = time.perf_counter_ns()
+
+        self._log(f"Starting scan of: {path}")
+
+        files = get_scannable_files(path, self.exclude_patterns)
+
+        self._log(f"Found {len(files)} files to scan")
+
+        results: List[ScanResult] = []
+        skipped_files = 0
+        batch_size = max(1, os.cpu_count() or 1)
+
+        for batch_start in range(0, len(files), batch_size):
+            batch = files[batch_start:batch_start + batch_size]
+            outcomes = await asyncio.gather(
+                *(asyncio.to_thread(self._scan_single_file, file) for file in batch),
+                return_exceptions=True,
+            )
+            for file, outcome in zip(batch, outcomes):
+                if isinstance(outcome, BaseException):
+                    self._log(f"Error scanning {file}: {outcome}")
+                    skipped_files += 1
+                elif outcome:
+                    results.append(outcome)
+                else:
+                    skipped_files += 1
+
+        summary = self._generate_summary(results, (time.perf_counter_ns() - start_ns) / 1e9, total_files=len(files), skipped_files=skipped_files)
+
+        return {
+            'results': results,
+            'summary': summary,
+            'scan_path': str(path),
+            'scan_timestamp': time.time()
+        }
+
+    def _scan_parallel(self, files: List[Path], prefetch_sem: Optional[threading.Semaphore] = None) -> tuple[List[ScanResult], int]:
+        """Scan files across worker processes.
+
+        Regex matching is CPU-bound and serialized by the GIL under threads,
+        so the heavy work runs in a ProcessPoolExecutor. Each worker compiles
+        the rule set once via _init_worker; callers resolve cache hits before
+        dispatch and writes are batched in the parent via set_many, so the
+        cache database is never touched concurrently. This is the one place
+        files fan out across cores — FileProcessor, RuleEngine and
+        ContextAnalyzer all ride along inside the workers (their state is
+        read-only after init), so they need no pools of their own.
 
         Returns tuple of (results, skipped_files_count)
         """
         results = []
         skipped = 0
-        
-        with ThreadPoolExecutor(max_workers=self.parallel_workers) as executor:
-            # Submit all scan tasks
-            future_to_file = {
-                executor.submit(self._scan_single_file, file): file 
-                for file in files
+        pending_writes = []
+
+        if not files:
+            return results, skipped
+
+        chunksize = max(1, len(files) // (self.parallel_workers * 4))
+
+        if 'fork' in multiprocessing.get_all_start_methods():
+            # Forked workers inherit the parent's already-compiled engine
+            # copy-on-write; no per-worker compile at all
+            global _WORKER_ENGINE, _WORKER_PROCESSOR
+            _WORKER_ENGINE = self.rule_engine
+            _WORKER_PROCESSOR = self.file_processor
+            pool_kwargs = {'mp_context': multiprocessing.get_context('fork')}
+        else:
+            # spawn (macOS/Windows): compile once per worker via the initializer
+            pool_kwargs = {
+                'initializer': _init_worker,
+                'initargs': (
+                    self.rule_engine.min_confidence_threshold,
+                    self.rule_engine.strict,
+                    self.file_processor.max_file_size,
+                ),
             }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_file):
-                file = future_to_file[future]
-                try:
-                    result = future.result()
+
+        # Files whose results were already consumed from the pool; on a
+        # mid-iteration failure only the tail is rescanned, so nothing is
+        # double-counted, double-cached or duplicated in results
+        consumed = 0
+        try:
+            with ProcessPoolExecutor(
+                max_workers=self.parallel_workers,
+                **pool_kwargs,
+            ) as executor:
+                for file, result in zip(
+                    files,
+                    executor.map(_scan_one, files, chunksize=chunksize),
+                ):
+                    consumed += 1
+                    if prefetch_sem:
+                        prefetch_sem.release()
+                    self.files_done += 1
                     if result:
                         results.append(result)
+                        if self.cache:
+                            pending_writes.append((file, result))
+                            if len(pending_writes) >= 256:
+                                self.cache.set_many(pending_writes)
+                                pending_writes = []
                     else:
                         skipped += 1
-                except Exception as e:
-                    if self.verbose:
-                        print(f"Error scanning {file}: {e}")
-                    skipped += 1
-        
+        except (OSError, ValueError, BrokenExecutor) as e:
+            # Process pools can be unavailable (restricted environments) or
+            # die mid-scan (BrokenProcessPool when a worker is killed);
+            # fall back to the thread-based path for the remaining files
+            self._log(f"Process pool unavailable ({e}); falling back to threads")
+            thread_results, thread_skipped = self._scan_parallel_threads(
+                files[consumed:], prefetch_sem
+            )
+            results.extend(thread_results)
+            skipped += thread_skipped
+
+        if self.cache and pending_writes:
+            self.cache.set_many(pending_writes)
+
         return results, skipped
-    
-    def _scan_sequential(self, files: List[Path]) -> tuple[List[ScanResult], int]:
+
+    def _scan_parallel_threads(self, files: List[Path], prefetch_sem: Optional[threading.Semaphore] = None) -> tuple[List[ScanResult], int]:
+        """Thread-based fallback used when a process pool cannot start.
+
+        Futures are submitted through a sliding window of 4 * workers rather
+        than all at once, so in-flight state stays O(workers) instead of
+        O(files) on large repos while the executor remains saturated.
+
+        Returns tuple of (results, skipped_files_count)
+        """
+        results = []
+        skipped = 0
+        window = max(1, self.parallel_workers) * 4
+
+        with ThreadPoolExecutor(max_workers=self.parallel_workers) as executor:
+            files_iter = iter(files)
+            in_flight = {
+                executor.submit(self._scan_single_file, file): file
+                for file in itertools.islice(files_iter, window)
+            }
+
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file = in_flight.pop(future)
+                    if prefetch_sem:
+                        prefetch_sem.release()
+                    self.files_done += 1
+                    try:
+                        result = future.result()
+                        if result:
+                            results.append(result)
+                        else:
+                            skipped += 1
+                    except Exception as e:
+                        self._log(f"Error scanning {file}: {e}")
+                        skipped += 1
+
+                # Refill the window with as many files as just completed
+                for file in itertools.islice(files_iter, len(done)):
+                    in_flight[executor.submit(self._scan_single_file, file)] = file
+
+        return results, skipped
+
+    def _scan_sequential(self, files: List[Path], prefetch_sem: Optional[threading.Semaphore] = None) -> tuple[List[ScanResult], int]:
         """Scan files sequentially.
 
         Returns tuple of (results, skipped_files_count)
         """
         results = []
         skipped = 0
-        
+
         for file in files:
             try:
                 result = self._scan_single_file(file)
@@ -153,10 +443,12 @@ class PromptScanner:
                 else:
                     skipped += 1
             except Exception as e:
-                if self.verbose:
-                    print(f"Error scanning {file}: {e}")
+                self._log(f"Error scanning {file}: {e}")
                 skipped += 1
-        
+            finally:
+                if prefetch_sem:
+                    prefetch_sem.release()
+
         return results, skipped
     
     def _scan_single_file(self, file_path: Path) -> Optional[ScanResult]:
@@ -178,52 +470,57 @@ class PromptScanner:
             language = self.file_processor.detect_language(file_path, content)
             
             # Apply rules
-            start_time = time.time()
+            t0 = time.perf_counter_ns()
             findings = self.rule_engine.apply_rules(content, file_path, language)
-            scan_time = time.time() - start_time
-            
+            scan_time_ns = time.perf_counter_ns() - t0
+
             # Create result
             result = ScanResult(
                 file_path=file_path,
                 findings=findings,
-                scan_time=scan_time,
+                scan_time_ns=scan_time_ns,
                 file_size=len(content),
                 language=language
             )
             
-            # Cache result
+            # Cache result (content already in hand, so no re-read to hash)
             if self.cache:
-                self.cache.set(file_path, result)
+                self.cache.set(file_path, result, content=content)
             
             return result
             
         except Exception as e:
-            if self.verbose:
-                print(f"Error processing {file_path}: {e}")
+            self._log(f"Error processing {file_path}: {e}")
             return None
     
     def _generate_summary(self, results: List[ScanResult], total_duration: float, total_files: int, skipped_files: int) -> ScanSummary:
         """Generate a summary of the scan results."""
-        total_findings = sum(len(r.findings) for r in results)
-        
-        # Count findings by severity
-        findings_by_severity = {}
-        findings_by_language = {}
-        
+        total_findings = 0
+
+        # Counter.update runs the per-finding counting in C instead of a
+        # Python-level dict.get(..., 0) + 1 per finding
+        findings_by_severity: Counter = Counter()
+        findings_by_language: Counter = Counter()
+
         for result in results:
-            for finding in result.findings:
-                severity = finding.get('severity', 'unknown')
-                findings_by_severity[severity] = findings_by_severity.get(severity, 0) + 1
-                
-                if result.language:
-                    findings_by_language[result.language] = findings_by_language.get(result.language, 0) + 1
-        
+            count = len(result.findings)
+            if not count:
+                continue
+            total_findings += count
+            findings_by_severity.update(
+                finding.get('severity', 'unknown') for finding in result.findings
+            )
+            if result.language:
+                findings_by_language[result.language] += count
+
         return ScanSummary(
             total_files=total_files,
             scanned_files=len(results),
             skipped_files=skipped_files,
             total_findings=total_findings,
             scan_duration=total_duration,
-            findings_by_severity=findings_by_severity,
-            findings_by_language=findings_by_language
+            # Plain dicts: Counter is a dict subclass, which some JSON
+            # serializers (orjson) refuse to encode natively
+            findings_by_severity=dict(findings_by_severity),
+            findings_by_language=dict(findings_by_language)
         )
@@ -2,26 +2,41 @@
 Repository indexer for building a lightweight index of repository files.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Dict, Any, List, Optional
-from dataclasses import dataclass
 import hashlib
+import json
+import mmap
+import os
 import time
 
 from .file_processor import FileProcessor
-from ..utils.file_utils import get_scannable_files, get_relative_path
+from ..utils.file_utils import get_scannable_entries, get_relative_path
 
+try:
+    import blake3  # tree-parallel SIMD hashing, saturates NVMe on large files
+except Exception:
+    blake3 = None
+
+try:
+    import orjson  # C-backed serializer, ~5-10x faster than stdlib json
+except Exception:
+    orjson = None
+
+
+def _dumps_entry(entry: Dict[str, Any]) -> str:
+    """Serialize one index record for streaming output."""
+    if orjson is not None:
+        return orjson.dumps(entry).decode('utf-8')
+    return json.dumps(entry)
+
+# Files at or above this size hash from a read-only memory mapping, so the
+# digest streams straight out of the page cache with no chunk copies; below
+# it the mmap setup cost outweighs the saved copy
+_HASH_MMAP_THRESHOLD = 4 * 1024 * 1024
 
-@dataclass
-class IndexedFile:
-    """Represents a single indexed file with metadata."""
-    path: str
-    relative_path: str
-    size_bytes: int
-    modified_time: float
-    extension: str
-    language: Optional[str]
-    sha256: Optional[str]
 
 
 class RepositoryIndexer:
@@ -32,102 +47,230 @@ class RepositoryIndexer:
         exclude_patterns: Optional[List[str]] = None,
         include_patterns: Optional[List[str]] = None,
         max_file_size_bytes: Optional[int] = None,
-        verbose: bool = False
+        verbose: bool = False,
+        cache_path: Optional[Path] = None,
+        hash_algorithm: str = 'sha256'
     ) -> None:
         self.exclude_patterns = exclude_patterns or []
         self.include_patterns = include_patterns or []
         self.max_file_size_bytes = max_file_size_bytes
         self.verbose = verbose
+        self.cache_path = cache_path
+        # blake3 hashes in parallel across internal tree chunks; fall back
+        # to sha256 when the optional module is missing
+        if hash_algorithm == 'blake3' and blake3 is None:
+            hash_algorithm = 'sha256'
+        self.hash_algorithm = hash_algorithm
         self.file_processor = FileProcessor()
 
         # Override file processor max size if provided
         if self.max_file_size_bytes is not None:
             self.file_processor.max_file_size = self.max_file_size_bytes
 
-    def index(self, root_path: Path) -> Dict[str, Any]:
+        # path -> [size, mtime_ns, ino, digest, algorithm]; unchanged files
+        # on re-index reuse the stored digest instead of re-hashing
+        self._hash_cache: Dict[str, List[Any]] = self._load_hash_cache()
+
+    def _process_file(self, entry: "tuple[Path, os.stat_result]", root_path: Path) -> Optional[Dict[str, Any]]:
+        """Read, language-detect and hash a single file.
+
+        Takes the (path, stat) pair produced during the directory walk, so
+        no second stat syscall is issued here. Returns the file's index
+        record as the dict that lands in the JSON output directly — no
+        intermediate dataclass to rematerialize — or None for files that
+        are over the size limit or cannot be accessed; safe to run
+        concurrently since it only touches the read-only file processor.
+        """
+        try:
+            file_path, stat = entry
+            size_bytes = stat.st_size
+            if self.max_file_size_bytes is not None and size_bytes > self.max_file_size_bytes:
+                # Respect max size if set explicitly
+                return None
+
+            content = self.file_processor.read_file(file_path)
+            # Even if content is None (e.g., skipped due to binary/size), still index basic metadata
+            language = None
+            if content is not None:
+                language = self.file_processor.detect_language(file_path, content)
+
+            resolved = str(file_path.resolve())
+
+            # Unchanged since the cached index run? Reuse the digest and
+            # skip the hash pass entirely; the stat triple catches edits,
+            # truncation and inode replacement
+            cached = self._hash_cache.get(resolved)
+            if (cached is not None
+                    and cached[:3] == [size_bytes, stat.st_mtime_ns, stat.st_ino]
+                    # entries from before the algorithm field are sha256
+                    and (cached[4] if len(cached) > 4 else 'sha256') == self.hash_algorithm):
+                return self._file_record(
+                    resolved, file_path, root_path, size_bytes, stat,
+                    language, cached[3]
+                )
+
+            # Compute a fast content digest (over full content when
+            # available). file_digest (3.11+) streams in C straight into
+            # OpenSSL's hardware-accelerated core, with no per-chunk Python
+            # overhead; blake3 additionally fans out across cores
+            digest = None
+            try:
+                if self.hash_algorithm == 'blake3' and blake3 is not None:
+                    digest = blake3.blake3(
+                        max_threads=blake3.blake3.AUTO
+                    ).update_mmap(str(file_path)).hexdigest()
+                else:
+                    with open(file_path, 'rb') as f:
+                        # Sequential readahead hint: the kernel prefetches
+                        # ahead of the digest loop, overlapping disk reads
+                        # with hash compute in this thread
+                        if hasattr(os, 'posix_fadvise'):
+                            try:
+                                os.posix_fadvise(
+                                    f.fileno(), 0, size_bytes,
+                                    os.POSIX_FADV_SEQUENTIAL
+                                )
+                            except OSError:
+                                pass
+                        if size_bytes >= _HASH_MMAP_THRESHOLD:
+                            # sha256() accepts any buffer, so the mapping feeds
+                            # OpenSSL directly from the page cache
+                            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                                digest = hashlib.sha256(mm).hexdigest()
+                        elif hasattr(hashlib, 'file_digest'):
+                            digest = hashlib.file_digest(f, 'sha256').hexdigest()
+                        else:
+                            hasher = hashlib.sha256()
+                            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                                hasher.update(chunk)
+                            digest = hasher.hexdigest()
+            except Exception:
+                digest = None
+
+            if digest is not None:
+                self._hash_cache[resolved] = [
+                    size_bytes, stat.st_mtime_ns, stat.st_ino, digest,
+                    self.hash_algorithm
+                ]
+
+            return self._file_record(
+                resolved, file_path, root_path, size_bytes, stat,
+                language, digest
+            )
+        except Exception:
+            # Skip files that cannot be accessed
+            return None
+
+    def _file_record(self, resolved, file_path, root_path, size_bytes, stat,
+                     language, digest) -> Dict[str, Any]:
+        """Build the JSON-ready index record for one file."""
+        return {
+            "path": resolved,
+            "relative_path": get_relative_path(file_path, root_path),
+            "size_bytes": size_bytes,
+            "modified_time": stat.st_mtime,
+            "extension": file_path.suffix.lower(),
+            "language": language,
+            # kept for consumers of the original schema
+            "sha256": digest if self.hash_algorithm == 'sha256' else None,
+            "content_digest": digest,
+            "digest_algorithm": self.hash_algorithm,
+        }
+
+    def _load_hash_cache(self) -> Dict[str, List[Any]]:
+        """Load the persisted stat-triple -> sha256 map, if configured."""
+        if self.cache_path is None:
+            return {}
+        try:
+            with open(self.cache_path, 'r') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _save_hash_cache(self) -> None:
+        """Persist the hash cache atomically (write sibling, os.replace)."""
+        if self.cache_path is None:
+            return
+        try:
+            tmp = self.cache_path.with_suffix(self.cache_path.suffix + f'.tmp.{os.getpid()}')
+            with open(tmp, 'w') as f:
+                json.dump(self._hash_cache, f)
+            os.replace(tmp, self.cache_path)
+        except (IOError, OSError, ValueError):
+            pass
+
+    def index(self, root_path: Path, output_stream=None) -> Dict[str, Any]:
         """
         Build an index of scannable files within root_path.
 
-        Returns a dictionary with files and summary statistics suitable for JSON serialization.
+        Returns a dictionary with files and summary statistics suitable for
+        JSON serialization. When output_stream (a text file object) is
+        given, the full JSON document is streamed to it record by record
+        instead — peak memory stays O(1) in the file count — and the
+        returned dict carries only the summary statistics, not the file
+        list.
         """
         start_time = time.time()
 
-        files = get_scannable_files(
+        files = get_scannable_entries(
             root_path,
             exclude_patterns=self.exclude_patterns,
             include_patterns=self.include_patterns
         )
 
-        indexed_files: List[IndexedFile] = []
+        indexed_files: List[Dict[str, Any]] = []
         language_counts: Dict[str, int] = {}
+        total_files = 0
         total_size = 0
 
-        for file_path in files:
-            try:
-                stat = file_path.stat()
-                size_bytes = stat.st_size
-                if self.max_file_size_bytes is not None and size_bytes > self.max_file_size_bytes:
-                    # Respect max size if set explicitly
-                    continue
-
-                content = self.file_processor.read_file(file_path)
-                # Even if content is None (e.g., skipped due to binary/size), still index basic metadata
-                language = None
-                if content is not None:
-                    language = self.file_processor.detect_language(file_path, content)
+        if output_stream is not None:
+            # The files array comes first so the summary keys — only known
+            # after the walk — can close out the same JSON object
+            output_stream.write('{"files": [')
 
-                # Compute a fast sha256 hash (over full content when available)
-                sha256_hash = None
-                try:
-                    hasher = hashlib.sha256()
-                    with open(file_path, 'rb') as f:
-                        for chunk in iter(lambda: f.read(1024 * 1024), b""):
-                            hasher.update(chunk)
-                    sha256_hash = hasher.hexdigest()
-                except Exception:
-                    sha256_hash = None
-
-                rel = get_relative_path(file_path, root_path)
-                indexed = IndexedFile(
-                    path=str(file_path.resolve()),
-                    relative_path=rel,
-                    size_bytes=size_bytes,
-                    modified_time=stat.st_mtime,
-                    extension=file_path.suffix.lower(),
-                    language=language,
-                    sha256=sha256_hash
-                )
-                indexed_files.append(indexed)
+        # Per-file work is read + hash, i.e. I/O-bound with the GIL released
+        # inside hashlib, so threads give near-linear speedup on large
+        # trees. executor.map preserves input order, keeping the index
+        # deterministic; counts aggregate in this thread, so no locks.
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for indexed in executor.map(
+                partial(self._process_file, root_path=root_path), files
+            ):
+                if indexed is None:
+                    continue
+                if output_stream is not None:
+                    if total_files:
+                        output_stream.write(', ')
+                    output_stream.write(_dumps_entry(indexed))
+                else:
+                    indexed_files.append(indexed)
+                total_files += 1
+                if indexed['language']:
+                    language_counts[indexed['language']] = language_counts.get(indexed['language'], 0) + 1
+                total_size += indexed['size_bytes']
 
-                if language:
-                    language_counts[language] = language_counts.get(language, 0) + 1
-                total_size += size_bytes
-            except Exception:
-                # Skip files that cannot be accessed
-                continue
+        self._save_hash_cache()
 
         duration = time.time() - start_time
 
-        return {
+        summary = {
             "root_path": str(root_path.resolve()),
             "generated_at": time.time(),
             "duration_seconds": duration,
-            "total_files": len(indexed_files),
+            "total_files": total_files,
             "total_bytes": total_size,
             "languages": language_counts,
-            "files": [
-                {
-                    "path": f.path,
-                    "relative_path": f.relative_path,
-                    "size_bytes": f.size_bytes,
-                    "modified_time": f.modified_time,
-                    "extension": f.extension,
-                    "language": f.language,
-                    "sha256": f.sha256,
-                }
-                for f in indexed_files
-            ],
         }
 
+        if output_stream is not None:
+            output_stream.write('], ')
+            output_stream.write(_dumps_entry(summary)[1:])
+            return summary
+
+        summary["files"] = indexed_files
+        return summary
+
 
 
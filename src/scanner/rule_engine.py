@@ -3,16 +3,226 @@ Rule engine for detecting prompt injection vulnerabilities.
 """
 
 import re
+from bisect import bisect_right
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set
 from dataclasses import dataclass
 
 from .context_analyzer import ContextAnalyzer
 
+try:
+    import hyperscan  # optional multi-pattern DFA used as a prefilter
+except Exception:
+    hyperscan = None
 
-@dataclass
+try:
+    import ahocorasick  # optional literal-anchor prefilter (pyahocorasick)
+except Exception:
+    ahocorasick = None
+
+# Constructs Hyperscan cannot compile (backreferences, lookarounds); patterns
+# containing them always run through the Python regex path
+_HS_UNSUPPORTED_RE = re.compile(r'\\\d|\(\?P=|\(\?[=!<]')
+
+
+def _literal_anchor(pattern: str) -> Optional[str]:
+    """Best-effort required-literal substring of a regex, or None.
+
+    Deliberately conservative: only top-level literal runs count, any
+    top-level alternation disqualifies the pattern (no single literal is
+    required then), and a character that may be optional via a following
+    quantifier is dropped from its run. A wrong anchor would cause missed
+    matches, so anything ambiguous returns None and the pattern simply
+    runs unfiltered.
+    """
+    runs: List[str] = []
+    cur: List[str] = []
+    depth = 0
+    in_class = False
+    i = 0
+    n = len(pattern)
+
+    while i < n:
+        ch = pattern[i]
+        if in_class:
+            if ch == '\\':
+                i += 2
+                continue
+            if ch == ']':
+                in_class = False
+            i += 1
+            continue
+        if ch == '\\':
+            if cur:
+                runs.append(''.join(cur))
+                cur = []
+            i += 2
+            continue
+        if ch == '[':
+            in_class = True
+            if cur:
+                runs.append(''.join(cur))
+                cur = []
+            i += 1
+            continue
+        if ch == '(':
+            depth += 1
+            if cur:
+                runs.append(''.join(cur))
+                cur = []
+            i += 1
+            continue
+        if ch == ')':
+            depth = max(0, depth - 1)
+            i += 1
+            continue
+        if ch == '|':
+            if depth == 0:
+                return None
+            i += 1
+            continue
+        if ch in '*?{':
+            # Previous char may repeat zero times; it is not guaranteed
+            if cur:
+                cur.pop()
+            if cur:
+                runs.append(''.join(cur))
+                cur = []
+            i += 1
+            continue
+        if ch in '.^$+}':
+            if cur:
+                runs.append(''.join(cur))
+                cur = []
+            i += 1
+            continue
+        if depth == 0:
+            cur.append(ch)
+        i += 1
+
+    if cur:
+        runs.append(''.join(cur))
+
+    best = max(runs, key=len, default='')
+    return best.lower() if len(best) >= 4 else None
+
+# Declarative rule tables: category -> (rule_id, severity, language, flags,
+# ((pattern, message), ...)). Keeping these at module level lets every engine
+# instance share one compile pass and makes the full pattern set enumerable
+# for the Hyperscan database.
+# Languages generic rules apply to; everything else (markdown, json, data
+# files) exits apply_rules before any split or regex work. The
+# language-specific tables only cover a subset of these.
+_CODE_LANGS = frozenset({
+    'python','javascript','typescript','java','go','ruby','php','c','cpp','csharp','rust',
+    'swift','kotlin','scala','dart','r','shell','powershell','batch'
+})
+
+# Directory names whose findings are suppressed unless clearly dangerous
+_NOISY_DIRS = frozenset({
+    'assets', 'asset', 'samples', 'sample', 'iso', 'vm', 'images', 'image', 'imgs', 'img'
+})
+
+# Documentation/data suffixes strict mode filters aggressively
+_DOC_SUFFIXES = frozenset({'.md', '.markdown', '.txt', '.csv', '.tsv'})
+
+
+def _newline_index(content: str) -> List[int]:
+    """Return the positions of every newline in content.
+
+    str.find runs a C-level memory scan between hits, so the loop executes
+    once per line rather than once per character; offsets stay in str index
+    space, matching match.start() even for non-ASCII content.
+    """
+    offsets = []
+    append = offsets.append
+    idx = content.find('\n')
+    while idx != -1:
+        append(idx)
+        idx = content.find('\n', idx + 1)
+    return offsets
+
+_GENERIC_RULE_TABLES = {
+    'direct_injection': ('PI-001', 'high', None, re.IGNORECASE, (
+        # User input + prompt
+        (r'(\w+)\s*\+\s*["\']([^"\']*prompt[^"\']*)["\']', 'User input concatenated with prompt'),
+        (r'["\']([^"\']*prompt[^"\']*)["\']\s*\+\s*(\w+)', 'Prompt concatenated with user input'),
+
+        # Variable assignment patterns
+        (r'(\w+)\s*=\s*(\w+)\s*\+\s*["\']([^"\']*prompt[^"\']*)["\']', 'Variable assignment with prompt injection'),
+        (r'(\w+)\s*=\s*["\']([^"\']*prompt[^"\']*)["\']\s*\+\s*(\w+)', 'Variable assignment with prompt injection'),
+
+        # Function calls with concatenation
+        (r'(\w+)\([^)]*\+\s*["\']([^"\']*prompt[^"\']*)["\']', 'Function call with prompt injection'),
+        (r'(\w+)\(["\']([^"\']*prompt[^"\']*)["\']\s*\+\s*[^)]*\)', 'Function call with prompt injection'),
+    )),
+    'system_pollution': ('PI-002', 'critical', None, re.IGNORECASE, (
+        # System role with user content
+        (r'role\s*[:=]\s*["\']system["\']\s*[,}]', 'System message role field'),
+        (r'content\s*[:=]\s*["\'][^"\']*\{[^}]*\}[^"\']*["\']', 'Message content includes placeholder'),
+    )),
+    'template_injection': ('PI-003', 'high', None, re.IGNORECASE | re.DOTALL, (
+        # Prompt variable assigned from formatted string
+        (r'\b(prompt|system_prompt|user_prompt)\s*=\s*(["\"])((?:(?!\2).)*\{[^}]*\}(?:(?!\2).)*)\2', 'Prompt variable with placeholder'),
+        (r'\b(prompt|system_prompt|user_prompt)\s*=\s*f["\"]((?:(?!\").)*\{[^}]*\}(?:(?!\").)*)["\"]', 'Prompt variable f-string with user variable'),
+        (r'\b(prompt|system_prompt|user_prompt)\s*=\s*["\"][^"\']*["\"]\s*\.\s*format\s*\([^)]*\)', 'Prompt variable using .format'),
+
+        # Object content field built with placeholders
+        (r'content\s*[:=]\s*f["\"][^"\']*\{[^}]*\}[^"\']*["\"]', 'Content f-string with user variable'),
+        (r'content\s*[:=]\s*["\"][^"\']*\{[^}]*\}[^"\']*["\"]', 'Content string with placeholder'),
+        (r'content\s*[:=]\s*["\"][^"\']*["\"]\s*\.\s*format\s*\([^)]*\)', 'Content string using .format'),
+    )),
+    'unsafe_formatting': ('PI-004', 'critical', None, re.IGNORECASE, (
+        # % formatting with user input
+        (r'["\']([^"\']*%[^"\']*)["\']\s*%\s*(\w+)', 'String formatting with user variable'),
+
+        # eval with user input
+        (r'eval\([^)]*\)', 'Eval with user input'),
+        (r'exec\([^)]*\)', 'Exec with user input'),
+
+        # Dynamic imports
+        (r'__import__\([^)]*\)', 'Dynamic import with user input'),
+    )),
+    'hardcoded_prompts': ('PI-005', 'medium', None, re.IGNORECASE | re.DOTALL, (
+        # Prompt variables
+        (r'\b(prompt|system_prompt|user_prompt)\s*=\s*["\"][^"\']*(\{user|\{input|\{query)[^"\']*["\"]', 'Hardcoded prompt with user placeholder'),
+        (r'\b(prompt|system_prompt|user_prompt)\s*=\s*f["\"][^"\']*\{[^}]*\}[^"\']*["\"]', 'Hardcoded prompt f-string with variable'),
+        # OpenAI/LLM messages content fields with placeholders
+        (r'messages\s*[:=]\s*\[[^\]]*content\s*[:=]\s*["\"][^"\']*\{[^}]*\}[^"\']*["\"][^\]]*\]', 'Messages content with placeholder'),
+        (r'content\s*[:=]\s*["\"][^"\']*(\{user|\{input|\{query)[^"\']*["\"]', 'Content with user placeholder'),
+    )),
+}
+
+_LANGUAGE_RULE_TABLES = {
+    'python': ('PI-PY-001', 'high', 'python', re.IGNORECASE, (
+        # OpenAI API patterns
+        (r'openai\.ChatCompletion\.create\([^)]*messages\s*=\s*\[[^\]]*\{[^}]*content[^}]*\{[^}]*\}[^}]*\}[^\]]*\]', 'OpenAI API with user input in messages'),
+        (r'openai\.Completion\.create\([^)]*prompt\s*=\s*[^)]*\+[^)]*\)', 'OpenAI Completion with concatenated prompt'),
+
+        # LangChain patterns
+        (r'PromptTemplate\([^)]*input_variables\s*=\s*\[[^\]]*\]', 'LangChain PromptTemplate with user variables'),
+        (r'LLMChain\([^)]*prompt\s*=\s*[^)]*\)', 'LangChain with user input'),
+    )),
+    'javascript': ('PI-JS-001', 'high', 'javascript', re.IGNORECASE, (
+        # OpenAI API patterns
+        (r'openai\.chat\.completions\.create\([^)]*messages\s*:\s*\[[^\]]*\{[^}]*content[^}]*\{[^}]*\}[^}]*\}[^\]]*\]', 'OpenAI API with user input in messages'),
+        (r'openai\.completions\.create\([^)]*prompt\s*:\s*[^)]*\+[^)]*\)', 'OpenAI Completion with concatenated prompt'),
+
+        # Template literals with user input ONLY in prompt/content contexts
+        (r'\b(prompt|content|systemPrompt|userPrompt)\s*=\s*`([^`]*\$\{[^}]*\}[^`]*)`', 'Template literal prompt/content assignment with user variable'),
+        (r'content\s*:\s*`([^`]*\$\{[^}]*\}[^`]*)`', 'Object content with template literal user variable'),
+    )),
+}
+
+
+@dataclass(slots=True)
 class Finding:
-    """Represents a single security finding."""
+    """Represents a single security finding.
+
+    Instances are engine-internal: apply_rules converts survivors to plain
+    dicts for the wire, so slots only have to hold through scoring and
+    filtering, where they cut per-finding memory and attribute cost.
+    """
     rule_id: str
     severity: str
     message: str
@@ -57,15 +267,38 @@ class RuleEngine:
         Returns:
             List of findings as dictionaries
         """
+        # Nothing below can fire for non-code languages; bail before the
+        # O(file size) split and newline index
+        if language not in _CODE_LANGS:
+            return []
+
         findings = []
-        lines = content.split('\n')
-        
+        # Newline positions, computed once: line numbers become a binary
+        # search instead of an O(position) slice-and-count per match, and
+        # line contents slice straight out of content — the full line list
+        # is only built below when findings actually survive
+        newline_offsets = _newline_index(content)
+
+        # Single prefilter pass over the content; patterns it rules out
+        # skip their Python regex run entirely (None = prefilter unavailable)
+        prefilter_hits = self._prefilter(content)
+
+        # Pure-ASCII content (virtually all source code) scans as bytes:
+        # byte offsets equal str offsets, and bytes matching avoids the
+        # Unicode case tables inside re
+        content_b = content.encode('ascii') if content.isascii() else None
+
         # Apply language-agnostic rules (but only for code-like languages to avoid data files)
-        findings.extend(self._apply_generic_rules(content, lines, file_path, language))
-        
+        findings.extend(self._apply_generic_rules(content, content_b, newline_offsets, file_path, language, prefilter_hits))
+
         # Apply language-specific rules
         if language:
-            findings.extend(self._apply_language_specific_rules(content, lines, file_path, language))
+            findings.extend(self._apply_language_specific_rules(content, content_b, newline_offsets, file_path, language, prefilter_hits))
+
+        # The common case — no rule fired — never splits the content
+        if not findings:
+            return []
+        lines = content.split('\n')
         
         # Score findings based on context analysis
         scored_findings = []
@@ -83,33 +316,39 @@ class RuleEngine:
         if self.strict:
             base_threshold = max(base_threshold, 0.7)
         filtered_findings = []
+        window_danger: Dict[tuple, bool] = {}
+        # Per-call invariants, hoisted out of the per-finding loop
+        suffix = file_path.suffix.lower()
+        is_doc = suffix in _DOC_SUFFIXES
+        in_noisy_path = any(part.lower() in _NOISY_DIRS for part in file_path.parts)
+        effective_threshold = {
+            s: max(base_threshold, t)
+            for s, t in self.per_severity_min_threshold.items()
+        }
         for f in scored_findings:
             sev = (f.severity or 'low').lower()
-            sev_threshold = self.per_severity_min_threshold.get(sev, base_threshold)
-            threshold = max(base_threshold, sev_threshold)
+            threshold = effective_threshold.get(sev, base_threshold)
             if f.confidence < threshold:
                 continue
-            # Always apply path-based noise suppression unless dangerous context nearby
-            suffix = file_path.suffix.lower()
-            lines_local = content.split('\n')
+            # Always apply path-based noise suppression unless dangerous context nearby.
+            # window_danger memoizes the danger verdict per (start, end)
+            # window for the duration of this call — equivalent to caching
+            # on (surrounding, language), since the surrounding text is a
+            # pure function of the window and language is fixed per call —
+            # so clustered findings pay for one regex pass per window
             start_line = max(0, f.line_number - 3)
-            end_line = min(len(lines_local), f.line_number + 3)
-            surrounding = '\n'.join(lines_local[start_line:end_line])
-            in_danger = self.context_analyzer._is_in_dangerous_context(surrounding, language or '')
-            noisy_dirs = { 'assets', 'asset', 'samples', 'sample', 'iso', 'vm', 'images', 'image', 'imgs', 'img' }
-            if any(part.lower() in noisy_dirs for part in file_path.parts):
-                if not in_danger:
-                    continue
-            if self.strict:
-                # Strongly filter documentation/data/examples unless clearly dangerous
-                suffix = file_path.suffix.lower()
-                is_doc = suffix in {'.md', '.markdown', '.txt', '.csv', '.tsv'}
-                # Re-check local dangerous context around line
-                lines = content.split('\n')
-                start_line = max(0, f.line_number - 3)
-                end_line = min(len(lines), f.line_number + 3)
+            end_line = min(len(lines), f.line_number + 3)
+            window = (start_line, end_line)
+            if window in window_danger:
+                in_danger = window_danger[window]
+            else:
                 surrounding = '\n'.join(lines[start_line:end_line])
                 in_danger = self.context_analyzer._is_in_dangerous_context(surrounding, language or '')
+                window_danger[window] = in_danger
+            if in_noisy_path and not in_danger:
+                continue
+            if self.strict:
+                # Strongly filter documentation/data/examples unless clearly dangerous
                 # If medium severity (e.g., hardcoded prompts), require dangerous context in strict mode
                 is_medium = (f.severity.lower() == 'medium')
                 if (is_doc and not in_danger) or (is_medium and not in_danger):
@@ -120,282 +359,150 @@ class RuleEngine:
             filtered_findings.append(f)
         
         # Convert findings to dictionaries and include small code snippet context
-        return [self._finding_to_dict(finding, content) for finding in filtered_findings]
+        return [self._finding_to_dict(finding, content, lines) for finding in filtered_findings]
     
-    def _apply_generic_rules(self, content: str, lines: List[str], file_path: Path, language: Optional[str]) -> List[Finding]:
+    def apply_rules_batch(self, files) -> Dict[Path, List[Dict[str, Any]]]:
+        """Apply the rules to many files with one engine instance.
+
+        Args:
+            files: Iterable of (file_path, content, language) tuples
+
+        Returns:
+            Dict mapping each file path to its findings
+
+        The compiled patterns, prefilter database and context-analyzer
+        memos are all reused across the batch. Multi-core fan-out happens
+        one level up — PromptScanner forks workers that each hold a
+        compiled engine — so this entry point stays single-process and is
+        safe to call from inside those workers.
+        """
+        return {
+            file_path: self.apply_rules(content, file_path, language)
+            for file_path, content, language in files
+        }
+
+    def _apply_generic_rules(self, content: str, content_b: Optional[bytes], newline_offsets: List[int], file_path: Path, language: Optional[str], prefilter_hits: Optional[Set[int]] = None) -> List[Finding]:
         """Apply language-agnostic rules."""
         findings = []
 
         # Restrict generic rules to code-like languages to reduce false positives
-        code_langs = {
-            'python','javascript','typescript','java','go','ruby','php','c','cpp','csharp','rust',
-            'swift','kotlin','scala','dart','r','shell','powershell','batch'
-        }
-        if language not in code_langs:
+        if language not in _CODE_LANGS:
             return findings
-        
-        # Rule 1: Direct prompt injection - user input concatenated into prompts
-        findings.extend(self._find_direct_prompt_injection(content, lines, file_path))
-        
-        # Rule 2: System prompt pollution - user content in system messages
-        findings.extend(self._find_system_prompt_pollution(content, lines, file_path))
-        
-        # Rule 3: Template injection patterns
-        findings.extend(self._find_template_injection(content, lines, file_path))
-        
-        # Rule 4: Unsafe string formatting
-        findings.extend(self._find_unsafe_formatting(content, lines, file_path))
-        
-        # Rule 5: Hardcoded prompts with user placeholders
-        findings.extend(self._find_hardcoded_prompts(content, lines, file_path))
-        
-        return findings
-    
-    def _apply_language_specific_rules(self, content: str, lines: List[str], file_path: Path, language: str) -> List[Finding]:
-        """Apply language-specific rules."""
-        findings = []
-        
-        if language == 'python':
-            findings.extend(self._apply_python_rules(content, lines, file_path))
-        elif language == 'javascript':
-            findings.extend(self._apply_javascript_rules(content, lines, file_path))
-        elif language == 'typescript':
-            findings.extend(self._apply_typescript_rules(content, lines, file_path))
-        
-        return findings
-    
-    def _find_direct_prompt_injection(self, content: str, lines: List[str], file_path: Path) -> List[Finding]:
-        """Find direct prompt injection patterns."""
-        findings = []
-        
-        # Patterns for user input being concatenated into prompts
-        patterns = [
-            # User input + prompt
-            (r'(\w+)\s*\+\s*["\']([^"\']*prompt[^"\']*)["\']', 'User input concatenated with prompt'),
-            (r'["\']([^"\']*prompt[^"\']*)["\']\s*\+\s*(\w+)', 'Prompt concatenated with user input'),
-            
-            # Variable assignment patterns
-            (r'(\w+)\s*=\s*(\w+)\s*\+\s*["\']([^"\']*prompt[^"\']*)["\']', 'Variable assignment with prompt injection'),
-            (r'(\w+)\s*=\s*["\']([^"\']*prompt[^"\']*)["\']\s*\+\s*(\w+)', 'Variable assignment with prompt injection'),
-            
-            # Function calls with concatenation
-            (r'(\w+)\([^)]*\+\s*["\']([^"\']*prompt[^"\']*)["\']', 'Function call with prompt injection'),
-            (r'(\w+)\(["\']([^"\']*prompt[^"\']*)["\']\s*\+\s*[^)]*\)', 'Function call with prompt injection'),
-        ]
-        
-        for pattern, message in patterns:
-            for match in re.finditer(pattern, content, re.IGNORECASE):
-                line_num = self._get_line_number(content, match.start())
-                findings.append(Finding(
-                    rule_id='PI-001',
-                    severity='high',
-                    message=message,
-                    line_number=line_num,
-                    line_content=lines[line_num - 1] if line_num <= len(lines) else '',
-                    context=match.group(0),
-                    file_path=file_path
-                ))
-        
-        return findings
-    
-    def _find_system_prompt_pollution(self, content: str, lines: List[str], file_path: Path) -> List[Finding]:
-        """Find system prompt pollution patterns."""
-        findings = []
-        
-        # Patterns for user content in system messages
-        patterns = [
-            # System role with user content
-            (r'role\s*[:=]\s*["\']system["\']\s*[,}]', 'System message role field'),
-            (r'content\s*[:=]\s*["\'][^"\']*\{[^}]*\}[^"\']*["\']', 'Message content includes placeholder'),
-        ]
-        
-        for pattern, message in patterns:
-            for match in re.finditer(pattern, content, re.IGNORECASE):
-                line_num = self._get_line_number(content, match.start())
-                findings.append(Finding(
-                    rule_id='PI-002',
-                    severity='critical',
-                    message=message,
-                    line_number=line_num,
-                    line_content=lines[line_num - 1] if line_num <= len(lines) else '',
-                    context=match.group(0),
-                    file_path=file_path
-                ))
-        
-        return findings
-    
-    def _find_template_injection(self, content: str, lines: List[str], file_path: Path) -> List[Finding]:
-        """Find template injection patterns."""
-        findings = []
-        
-        # Template injection patterns (narrowed to prompt/content contexts)
-        patterns = [
-            # Prompt variable assigned from formatted string
-            (r'\b(prompt|system_prompt|user_prompt)\s*=\s*(["\"])((?:(?!\2).)*\{[^}]*\}(?:(?!\2).)*)\2', 'Prompt variable with placeholder'),
-            (r'\b(prompt|system_prompt|user_prompt)\s*=\s*f["\"]((?:(?!\").)*\{[^}]*\}(?:(?!\").)*)["\"]', 'Prompt variable f-string with user variable'),
-            (r'\b(prompt|system_prompt|user_prompt)\s*=\s*["\"][^"\']*["\"]\s*\.\s*format\s*\([^)]*\)', 'Prompt variable using .format'),
-            
-            # Object content field built with placeholders
-            (r'content\s*[:=]\s*f["\"][^"\']*\{[^}]*\}[^"\']*["\"]', 'Content f-string with user variable'),
-            (r'content\s*[:=]\s*["\"][^"\']*\{[^}]*\}[^"\']*["\"]', 'Content string with placeholder'),
-            (r'content\s*[:=]\s*["\"][^"\']*["\"]\s*\.\s*format\s*\([^)]*\)', 'Content string using .format'),
-        ]
-        
-        for pattern, message in patterns:
-            for match in re.finditer(pattern, content, re.IGNORECASE | re.DOTALL):
-                line_num = self._get_line_number(content, match.start())
-                findings.append(Finding(
-                    rule_id='PI-003',
-                    severity='high',
-                    message=message,
-                    line_number=line_num,
-                    line_content=lines[line_num - 1] if line_num <= len(lines) else '',
-                    context=match.group(0),
-                    file_path=file_path
-                ))
-        
-        return findings
-    
-    def _find_unsafe_formatting(self, content: str, lines: List[str], file_path: Path) -> List[Finding]:
-        """Find unsafe string formatting patterns."""
-        findings = []
-        
-        # Unsafe formatting patterns
-        patterns = [
-            # % formatting with user input
-            (r'["\']([^"\']*%[^"\']*)["\']\s*%\s*(\w+)', 'String formatting with user variable'),
-            
-            # eval with user input
-            (r'eval\([^)]*\)', 'Eval with user input'),
-            (r'exec\([^)]*\)', 'Exec with user input'),
-            
-            # Dynamic imports
-            (r'__import__\([^)]*\)', 'Dynamic import with user input'),
-        ]
-        
-        for pattern, message in patterns:
-            for match in re.finditer(pattern, content, re.IGNORECASE):
-                line_num = self._get_line_number(content, match.start())
-                findings.append(Finding(
-                    rule_id='PI-004',
-                    severity='critical',
-                    message=message,
-                    line_number=line_num,
-                    line_content=lines[line_num - 1] if line_num <= len(lines) else '',
-                    context=match.group(0),
-                    file_path=file_path
-                ))
-        
-        return findings
-    
-    def _find_hardcoded_prompts(self, content: str, lines: List[str], file_path: Path) -> List[Finding]:
-        """Find hardcoded prompts with user placeholders."""
-        findings = []
-        
-        # Hardcoded prompt patterns limited to LLM-related contexts
-        patterns = [
-            # Prompt variables
-            (r'\b(prompt|system_prompt|user_prompt)\s*=\s*["\"][^"\']*(\{user|\{input|\{query)[^"\']*["\"]', 'Hardcoded prompt with user placeholder'),
-            (r'\b(prompt|system_prompt|user_prompt)\s*=\s*f["\"][^"\']*\{[^}]*\}[^"\']*["\"]', 'Hardcoded prompt f-string with variable'),
-            # OpenAI/LLM messages content fields with placeholders
-            (r'messages\s*[:=]\s*\[[^\]]*content\s*[:=]\s*["\"][^"\']*\{[^}]*\}[^"\']*["\"][^\]]*\]', 'Messages content with placeholder'),
-            (r'content\s*[:=]\s*["\"][^"\']*(\{user|\{input|\{query)[^"\']*["\"]', 'Content with user placeholder'),
-        ]
-        
-        for pattern, message in patterns:
-            for match in re.finditer(pattern, content, re.IGNORECASE | re.DOTALL):
-                line_num = self._get_line_number(content, match.start())
-                findings.append(Finding(
-                    rule_id='PI-005',
-                    severity='medium',
-                    message=message,
-                    line_number=line_num,
-                    line_content=lines[line_num - 1] if line_num <= len(lines) else '',
-                    context=match.group(0),
-                    file_path=file_path
-                ))
-        
-        return findings
-    
-    def _apply_python_rules(self, content: str, lines: List[str], file_path: Path) -> List[Finding]:
-        """Apply Python-specific rules."""
-        findings = []
-        
-        # Python-specific patterns
-        patterns = [
-            # OpenAI API patterns
-            (r'openai\.ChatCompletion\.create\([^)]*messages\s*=\s*\[[^\]]*\{[^}]*content[^}]*\{[^}]*\}[^}]*\}[^\]]*\]', 'OpenAI API with user input in messages'),
-            (r'openai\.Completion\.create\([^)]*prompt\s*=\s*[^)]*\+[^)]*\)', 'OpenAI Completion with concatenated prompt'),
-            
-            # LangChain patterns
-            (r'PromptTemplate\([^)]*input_variables\s*=\s*\[[^\]]*\]', 'LangChain PromptTemplate with user variables'),
-            (r'LLMChain\([^)]*prompt\s*=\s*[^)]*\)', 'LangChain with user input'),
-        ]
-        
-        for pattern, message in patterns:
-            for match in re.finditer(pattern, content, re.IGNORECASE):
-                line_num = self._get_line_number(content, match.start())
-                findings.append(Finding(
-                    rule_id='PI-PY-001',
-                    severity='high',
-                    message=message,
-                    line_number=line_num,
-                    line_content=lines[line_num - 1] if line_num <= len(lines) else '',
-                    context=match.group(0),
-                    file_path=file_path,
-                    language='python'
-                ))
-        
+
+        for category in _GENERIC_RULE_TABLES:
+            findings.extend(self._run_category(category, content, content_b, newline_offsets, file_path, prefilter_hits))
+
         return findings
-    
-    def _apply_javascript_rules(self, content: str, lines: List[str], file_path: Path) -> List[Finding]:
-        """Apply JavaScript-specific rules."""
+
+    def _run_category(self, category: str, content: str, content_b: Optional[bytes], newline_offsets: List[int], file_path: Path, prefilter_hits: Optional[Set[int]] = None) -> List[Finding]:
+        """Run every compiled pattern of one rule category over the content.
+
+        When the caller supplies the ASCII bytes form, matching runs on it
+        (offsets are interchangeable with the str) and only the matched
+        spans are decoded back for the finding.
+        """
         findings = []
-        
-        # JavaScript-specific patterns
-        patterns = [
-            # OpenAI API patterns
-            (r'openai\.chat\.completions\.create\([^)]*messages\s*:\s*\[[^\]]*\{[^}]*content[^}]*\{[^}]*\}[^}]*\}[^\]]*\]', 'OpenAI API with user input in messages'),
-            (r'openai\.completions\.create\([^)]*prompt\s*:\s*[^)]*\+[^)]*\)', 'OpenAI Completion with concatenated prompt'),
-            
-            # Template literals with user input ONLY in prompt/content contexts
-            (r'\b(prompt|content|systemPrompt|userPrompt)\s*=\s*`([^`]*\$\{[^}]*\}[^`]*)`', 'Template literal prompt/content assignment with user variable'),
-            (r'content\s*:\s*`([^`]*\$\{[^}]*\}[^`]*)`', 'Object content with template literal user variable'),
-        ]
-        
-        for pattern, message in patterns:
-            for match in re.finditer(pattern, content, re.IGNORECASE):
-                line_num = self._get_line_number(content, match.start())
+        rule_id, severity, rule_language, _, compiled = self._compiled_patterns[category]
+        scan_bytes = content_b is not None
+
+        for pid, pattern, pattern_b, message in compiled:
+            # The prefilter already proved this pattern cannot match
+            if prefilter_hits is not None and pid not in prefilter_hits:
+                continue
+            matches = pattern_b.finditer(content_b) if scan_bytes else pattern.finditer(content)
+            for match in matches:
+                line_num = self._get_line_number(newline_offsets, match.start())
+                # Slice the matched line out of content; no line list needed
+                line_start = newline_offsets[line_num - 2] + 1 if line_num >= 2 else 0
+                line_end = newline_offsets[line_num - 1] if line_num - 1 < len(newline_offsets) else len(content)
                 findings.append(Finding(
-                    rule_id='PI-JS-001',
-                    severity='high',
+                    rule_id=rule_id,
+                    severity=severity,
                     message=message,
                     line_number=line_num,
-                    line_content=lines[line_num - 1] if line_num <= len(lines) else '',
-                    context=match.group(0),
+                    line_content=content[line_start:line_end],
+                    context=match.group(0).decode('ascii') if scan_bytes else match.group(0),
                     file_path=file_path,
-                    language='javascript'
+                    language=rule_language
                 ))
-        
+
         return findings
-    
-    def _apply_typescript_rules(self, content: str, lines: List[str], file_path: Path) -> List[Finding]:
-        """Apply TypeScript-specific rules."""
+
+    def _apply_language_specific_rules(self, content: str, content_b: Optional[bytes], newline_offsets: List[int], file_path: Path, language: str, prefilter_hits: Optional[Set[int]] = None) -> List[Finding]:
+        """Apply language-specific rules."""
         # TypeScript rules are similar to JavaScript for now
-        return self._apply_javascript_rules(content, lines, file_path)
-    
-    def _get_line_number(self, content: str, position: int) -> int:
-        """Get line number for a character position in content."""
-        return content[:position].count('\n') + 1
+        if language == 'typescript':
+            language = 'javascript'
+
+        if language not in _LANGUAGE_RULE_TABLES:
+            return []
+
+        return self._run_category(language, content, content_b, newline_offsets, file_path, prefilter_hits)
+
+    def _prefilter(self, content: str) -> Optional[Set[int]]:
+        """Return the set of pattern ids that can possibly match, or None.
+
+        One pass over the content — Hyperscan DFA when available, otherwise
+        an Aho-Corasick walk over required-literal anchors — is O(n)
+        regardless of rule count; the Python regexes then run only for the
+        surviving ids, to recover exact spans and groups. Ids without
+        prefilter coverage are always included. This is the single
+        multi-pattern scan for the whole rule set: with Hyperscan present,
+        file bytes are walked once by the DFA instead of once per rule.
+        """
+        if self._hs_db is not None:
+            hits: Set[int] = set()
+
+            def _on_match(pattern_id, start, end, flags, context=None):
+                hits.add(pattern_id)
+
+            try:
+                self._hs_db.scan(content.encode('utf-8', errors='replace'), match_event_handler=_on_match)
+            except Exception:
+                return None
+
+            return hits | self._uncovered
+
+        if self._ac_automaton is not None:
+            hits = set()
+            try:
+                # Anchors are lowercase; one lowered copy covers IGNORECASE
+                for _, pids in self._ac_automaton.iter(content.lower()):
+                    hits.update(pids)
+            except Exception:
+                return None
+
+            return hits | self._uncovered
+
+        if self._anchor_map:
+            hits = set()
+            lowered = content.lower()
+            for anchor, pids in self._anchor_map.items():
+                if anchor in lowered:
+                    hits.update(pids)
+            return hits | self._uncovered
+
+        return None
+
+    def _get_line_number(self, newline_offsets: List[int], position: int) -> int:
+        """Get line number for a character position via the newline index.
+
+        O(log lines) per lookup with no transient allocation — strictly
+        better than both content[:position].count('\n') (which copied the
+        prefix) and the allocation-free content.count('\n', 0, position)
+        (still O(position) per match).
+        """
+        return bisect_right(newline_offsets, position - 1) + 1
     
-    def _finding_to_dict(self, finding: Finding, content: Optional[str] = None) -> Dict[str, Any]:
+    def _finding_to_dict(self, finding: Finding, content: Optional[str] = None, lines: Optional[List[str]] = None) -> Dict[str, Any]:
         """Convert Finding object to dictionary."""
         # Build small code snippet of +/- 2 lines around the finding
         snippet = None
         reasons_list = None
         if content:
             try:
-                lines = content.split('\n')
+                if lines is None:
+                    lines = content.split('\n')
                 start_idx = max(0, finding.line_number - 3)
                 end_idx = min(len(lines), finding.line_number + 2)
                 snippet_lines = lines[start_idx:end_idx]
@@ -461,6 +568,85 @@ class RuleEngine:
         }
     
     def _compile_patterns(self):
-        """Pre-compile regex patterns for performance."""
-        # This would compile all patterns used in the rules
-        pass
+        """Compile every rule pattern once and build the optional prefilters.
+
+        This is the only place a pattern string meets re.compile: the rule
+        tables live in module-level constants and _run_category iterates the
+        compiled objects, so scanning never re-parses a pattern or takes the
+        bounded re._cache lookup per finditer call.
+
+        Every pattern gets a process-unique integer id. Hyperscan (preferred)
+        or an Aho-Corasick automaton over required-literal anchors then maps
+        file content to the set of ids that can possibly match; ids with no
+        prefilter coverage are always run.
+        """
+        tables = {**_GENERIC_RULE_TABLES, **_LANGUAGE_RULE_TABLES}
+        hs_expressions = []
+        hs_ids = []
+        anchor_map: Dict[str, List[int]] = {}
+        self._uncovered: Set[int] = set()
+        pid = 0
+
+        # Anchors back both the Aho-Corasick prefilter and, with neither
+        # optional module installed, a plain substring-needle reject
+        use_anchors = hyperscan is None
+
+        for category, (rule_id, severity, language, flags, patterns) in tables.items():
+            compiled = []
+            for pattern, message in patterns:
+                covered = False
+                if hyperscan is not None and not _HS_UNSUPPORTED_RE.search(pattern):
+                    hs_expressions.append(pattern.encode('utf-8'))
+                    hs_ids.append(pid)
+                    covered = True
+                elif use_anchors:
+                    anchor = _literal_anchor(pattern)
+                    if anchor:
+                        anchor_map.setdefault(anchor, []).append(pid)
+                        covered = True
+                if not covered:
+                    self._uncovered.add(pid)
+                # Compile each pattern for str and for bytes: ASCII files
+                # scan as bytes, where re skips the Unicode case tables
+                compiled.append((
+                    pid,
+                    re.compile(pattern, flags),
+                    re.compile(pattern.encode('utf-8'), flags),
+                    message,
+                ))
+                pid += 1
+            self._compiled_patterns[category] = (rule_id, severity, language, flags, tuple(compiled))
+
+        # Optional Hyperscan prefilter database. CASELESS|DOTALL is a superset
+        # of every table's flags, so the prefilter can over-match but never
+        # miss; SINGLEMATCH reports each pattern id at most once.
+        self._hs_db = None
+        if hyperscan is not None and hs_expressions:
+            try:
+                db = hyperscan.Database()
+                hs_flags = [
+                    hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_DOTALL | hyperscan.HS_FLAG_SINGLEMATCH
+                ] * len(hs_expressions)
+                db.compile(expressions=hs_expressions, ids=hs_ids, flags=hs_flags)
+                self._hs_db = db
+            except Exception:
+                self._hs_db = None
+                self._uncovered.update(hs_ids)
+
+        # Aho-Corasick fallback: one automaton pass over the lowercased
+        # content finds which literal anchors occur at all
+        self._ac_automaton = None
+        if anchor_map and ahocorasick is not None:
+            try:
+                automaton = ahocorasick.Automaton()
+                for anchor, pids in anchor_map.items():
+                    automaton.add_word(anchor, tuple(pids))
+                automaton.make_automaton()
+                self._ac_automaton = automaton
+            except Exception:
+                self._ac_automaton = None
+
+        # Pure-stdlib needle reject: anchors checked with `in`, which runs
+        # CPython's two-way substring search in C. The anchor count is
+        # small, so a handful of scans beats running every regex.
+        self._anchor_map = anchor_map if self._ac_automaton is None else {}
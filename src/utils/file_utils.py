@@ -2,73 +2,353 @@
 File utilities for the scanner.
 """
 
+import contextlib
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Set
+from typing import List, Set, Tuple
 from pathspec import PathSpec
 from pathspec.patterns import GitWildMatchPattern
 
+# Directories never worth descending into; pruned at the dirent level so
+# their contents are not even stat()ed
+SKIP_DIRS = frozenset({
+    'node_modules', 'dist', 'build', 'target', '__pycache__', '.git',
+    'vendor', 'bower_components', 'jspm_packages', 'coverage',
+    '.pytest_cache', '.mypy_cache', '.tox', '.venv', 'venv', 'env'
+})
+
+class _UnionSpec:
+    """Drop-in for PathSpec matching when all patterns are positive.
+
+    PathSpec.match_file runs one compiled regex per pattern per path; the
+    union form joins every translated fragment with '|' so the re engine
+    answers "does any pattern match" in a single pass over the path.
+    """
+
+    __slots__ = ('_regex',)
+
+    def __init__(self, regex: "re.Pattern") -> None:
+        self._regex = regex
+
+    def match_file(self, path: str) -> bool:
+        return self._regex.match(path) is not None
+
+
+# Compiling a spec regex-translates every pattern, which dominates short
+# walks when the same exclude list is passed scan after scan (the
+# config-driven case). Keyed on the full pattern tuple, so a changed
+# .gitignore produces a new key and a fresh spec.
+@lru_cache(maxsize=32)
+def _compiled_spec(patterns: Tuple[str, ...]):
+    """Build (or reuse) the matcher for a tuple of gitwildmatch patterns.
+
+    Returns a _UnionSpec when every pattern is a plain positive match.
+    Negations ('!keep.js') need gitignore's last-match-wins ordering,
+    which a union regex cannot express, so those fall back to PathSpec.
+    """
+    fragments = []
+    for pattern in patterns:
+        try:
+            regex, include = GitWildMatchPattern.pattern_to_regex(pattern)
+        except Exception:
+            return PathSpec.from_lines(GitWildMatchPattern, patterns)
+        if include is None:  # comments / blank lines
+            continue
+        if not include or '(?P=' in regex:
+            return PathSpec.from_lines(GitWildMatchPattern, patterns)
+        # Anonymize named groups ((?P<ps_d>...)) so fragments can share
+        # one compiled pattern without group-name collisions
+        fragments.append(re.sub(r'\(\?P<[^>]+>', '(?:', regex))
+    if not fragments:
+        return PathSpec.from_lines(GitWildMatchPattern, patterns)
+    return _UnionSpec(re.compile('|'.join('(?:%s)' % f for f in fragments)))
+
+
+# Below this many extensionless files, thread-pool startup costs more
+# than the content sniffs it would overlap
+_SNIFF_PARALLEL_MIN = 16
+
+# Characters that make a gitwildmatch pattern non-literal
+_GLOB_META_RE = re.compile(r'[*?\[\\]')
+
+
+def _literal_dir_prefix(pattern: str) -> "str | None":
+    """Anchored literal directory prefix of an include pattern, or None.
+
+    'src/**' -> 'src/' and 'src/app/*.py' -> 'src/app/', so the walk can
+    skip directories outside the prefix entirely. Returns None for
+    patterns that are unanchored (no slash before the final position —
+    gitignore matches those at any depth) or negated, where no such
+    pruning is sound.
+    """
+    if pattern.startswith('!') or '/' not in pattern[:-1]:
+        return None
+    meta = _GLOB_META_RE.search(pattern)
+    literal = pattern[:meta.start()] if meta else pattern
+    literal = literal.lstrip('/')
+    return literal[:literal.rfind('/') + 1]
+
+
+# Sniff verdicts keyed by path; entries carry the (ino, mtime_ns, size)
+# triple they were computed under, so an edited or replaced file
+# re-sniffs while repeat scans of an unchanged tree skip the read
+_sniff_memo: dict = {}
+
+# Every byte value that is not printable ASCII or common whitespace;
+# translate() deletes these in C, so counting survivors replaces a
+# per-byte Python loop in the text sniff
+_NON_PRINTABLE = bytes(
+    b for b in range(256) if not (32 <= b <= 126 or b in (9, 10, 13))
+)
+
+# File extensions considered scannable
+SCANNABLE_EXTENSIONS = frozenset({
+    # Programming languages
+    '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.cs', '.php',
+    '.rb', '.go', '.rs', '.swift', '.kt', '.scala', '.dart', '.r', '.m', '.mm',
+    # Web technologies
+    '.html', '.htm', '.css', '.scss', '.sass', '.less', '.vue', '.svelte',
+    # Configuration files
+    '.json', '.yaml', '.yml', '.toml', '.ini', '.cfg', '.conf', '.config',
+    '.env', '.properties', '.xml', '.csv',
+    # Documentation
+    '.md', '.txt', '.rst', '.adoc',
+    # Shell scripts
+    '.sh', '.bash', '.zsh', '.fish', '.ps1', '.bat', '.cmd',
+    # Other
+    '.sql', '.graphql', '.gql', '.proto', '.thrift'
+})
+
 
 def get_scannable_files(
-    root_path: Path, 
+    root_path: Path,
     exclude_patterns: List[str] = None,
     include_patterns: List[str] = None
 ) -> List[Path]:
     """
     Get all scannable files in a directory.
-    
+
+    Walks with os.scandir rather than rglob: excluded and hidden directories
+    are pruned at the dirent level, so their contents are never stat()ed and
+    no Path objects are built for them — on monorepos with a node_modules
+    this is most of the traversal cost.
+
     Args:
         root_path: Root directory to scan
         exclude_patterns: Patterns to exclude (e.g., ['node_modules', 'dist'])
         include_patterns: Patterns to include (if None, include all scannable files)
-        
+
     Returns:
         List of file paths to scan
     """
+    return _walk_scannable(root_path, exclude_patterns, include_patterns,
+                           collect_stats=False)
+
+
+def get_scannable_entries(
+    root_path: Path,
+    exclude_patterns: List[str] = None,
+    include_patterns: List[str] = None
+) -> List[Tuple[Path, os.stat_result]]:
+    """
+    Like get_scannable_files, but pair each path with its stat result.
+
+    The stat comes from the DirEntry during the walk, so callers that need
+    metadata anyway (the indexer) avoid re-statting every file afterwards.
+    Downstream size/mtime checks should read from the returned stat rather
+    than calling Path.stat again — every other syscall in the pipeline
+    (read_file's fstat, the text sniff, the cache probe) already operates
+    on an fd or stat it holds, so one stat per file is the budget here.
+
+    Returns:
+        List of (path, stat_result) tuples
+    """
+    return _walk_scannable(root_path, exclude_patterns, include_patterns,
+                           collect_stats=True)
+
+
+def _read_gitignore_patterns(root_path: Path) -> List[str]:
+    """Read root_path/.gitignore and return its non-comment pattern lines."""
+    try:
+        lines = (root_path / '.gitignore').read_text().splitlines()
+    except Exception:
+        return []
+    # Keep non-empty, non-comment lines; strip each line once
+    return [s for s in (ln.strip() for ln in lines) if s and s[0] != '#']
+
+
+def _walk_scannable(root_path, exclude_patterns, include_patterns, collect_stats):
+    """Shared scandir walk behind the two public listing helpers.
+
+    Exclusions are enforced while walking, not filtered afterwards: a
+    directory matching the skip list, a leading dot, or an exclude
+    pattern is never pushed onto the stack, so nothing beneath it is
+    listed, stat()ed or materialized as a Path. Directory candidates are
+    matched with a trailing '/' so gitignore-style dir patterns apply.
+    Each entry builds its relative posix string exactly once (prefix
+    concatenation, no Path.relative_to round trip) and every pattern
+    test reuses it; Path objects are only allocated for entries that
+    survive all filters.
+    """
     exclude_patterns = exclude_patterns or []
     include_patterns = include_patterns or []
-    
-    # Load .gitignore if present and merge into excludes
-    gitignore_path = root_path / '.gitignore'
-    if gitignore_path.exists():
+    root = str(root_path)
+
+    # The .gitignore read and the root directory listing touch independent
+    # inodes, so overlap them: a worker reads and parses the ignore file
+    # while this thread lists the root. The pattern result is joined
+    # before any matching happens.
+    with ThreadPoolExecutor(max_workers=1) as gitignore_pool:
+        gitignore_future = gitignore_pool.submit(_read_gitignore_patterns, root_path)
         try:
-            lines = gitignore_path.read_text().splitlines()
-            # Keep non-empty, non-comment lines
-            gitignore_patterns = [ln.strip() for ln in lines if ln.strip() and not ln.strip().startswith('#')]
-            # Convert gitignore entries to pathspec-friendly patterns (leave as-is; pathspec supports GitWildMatchPattern)
-            exclude_patterns = list(exclude_patterns) + gitignore_patterns
-        except Exception:
-            pass
-    
+            root_entries = list(os.scandir(root))
+        except OSError:
+            root_entries = []
+        gitignore_patterns = gitignore_future.result()
+    if gitignore_patterns:
+        # Merge as-is; pathspec understands raw gitignore lines
+        exclude_patterns = list(exclude_patterns) + gitignore_patterns
+
+    # Split purely literal exclude names ('node_modules', 'dist/') out of
+    # the pattern set: they become set-membership checks on entry.name,
+    # bypassing the regex for the overwhelmingly common case. Skipped
+    # when negations are present, since those need last-match-wins
+    # ordering over the full list.
+    literal_excludes: Set[str] = set()
+    literal_exclude_dirs: Set[str] = set()
+    spec_patterns = exclude_patterns
+    if exclude_patterns and not any(p.startswith('!') for p in exclude_patterns):
+        spec_patterns = []
+        for p in exclude_patterns:
+            core = p[:-1] if p.endswith('/') else p
+            if core and '/' not in core and not _GLOB_META_RE.search(core):
+                (literal_exclude_dirs if p.endswith('/') else literal_excludes).add(core)
+            else:
+                spec_patterns.append(p)
+
     # Build pathspec for exclusion
     exclude_spec = None
-    if exclude_patterns:
-        exclude_spec = PathSpec.from_lines(GitWildMatchPattern, exclude_patterns)
-    
+    if spec_patterns:
+        exclude_spec = _compiled_spec(tuple(spec_patterns))
+
     # Build pathspec for inclusion
     include_spec = None
     if include_patterns:
-        include_spec = PathSpec.from_lines(GitWildMatchPattern, include_patterns)
-    
+        include_spec = _compiled_spec(tuple(include_patterns))
+
+    # When every include pattern is anchored under a literal directory
+    # ('src/**'), directories outside those prefixes cannot contain a
+    # match and are pruned without listing them
+    include_prefixes = None
+    if include_patterns:
+        include_prefixes = []
+        for p in include_patterns:
+            prefix = _literal_dir_prefix(p)
+            if prefix is None:
+                include_prefixes = None
+                break
+            include_prefixes.append(prefix)
+
     scannable_files = []
-    
-    # Walk through all files
-    for file_path in root_path.rglob('*'):
-        if not file_path.is_file():
-            continue
-        
-        # Skip if excluded
-        if exclude_spec and exclude_spec.match_file(str(file_path)):
-            continue
-        
-        # Skip if not included (when include patterns are specified)
-        if include_spec and not include_spec.match_file(str(file_path)):
-            continue
-        
-        # Check if file is scannable
-        if is_scannable_file(file_path):
-            scannable_files.append(file_path)
-    
+    pending_sniffs = []
+
+    # Iterative scandir walk; the stack holds (absolute dir, relative
+    # prefix), so the relative string is computed once per directory and
+    # extended per entry. This subsumes the os.walk(topdown=True) +
+    # dirs[:] prune idiom while keeping each DirEntry (and its cached
+    # stat) in hand for the type checks below. The root's entries were
+    # already listed above, concurrently with the .gitignore read.
+    stack = [(root, '', root_entries)]
+    while stack:
+        dir_path, rel_prefix, preloaded = stack.pop()
+        with contextlib.ExitStack() as dir_ctx:
+            if preloaded is None:
+                try:
+                    entries = dir_ctx.enter_context(os.scandir(dir_path))
+                except OSError:
+                    continue
+            else:
+                entries = preloaded
+            for entry in entries:
+                name = entry.name
+                rel = rel_prefix + name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        # Prune hidden/skip-list/excluded dirs before descending
+                        if name.startswith('.') or name in SKIP_DIRS:
+                            continue
+                        if name in literal_excludes or name in literal_exclude_dirs:
+                            continue
+                        reld = rel + '/'
+                        if exclude_spec and exclude_spec.match_file(reld):
+                            continue
+                        if include_prefixes is not None and not any(
+                            prefix.startswith(reld) or reld.startswith(prefix)
+                            for prefix in include_prefixes
+                        ):
+                            continue
+                        stack.append((entry.path, reld, None))
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                except OSError:
+                    continue
+
+                if name.startswith('.') or name in literal_excludes:
+                    continue
+
+                # Cheap extension gate before any pattern matching
+                dot = name.rfind('.')
+                ext = name[dot:].lower() if dot > 0 else ''
+                if ext and ext not in SCANNABLE_EXTENSIONS:
+                    continue
+
+                # Skip if excluded
+                if exclude_spec and exclude_spec.match_file(rel):
+                    continue
+
+                # Skip if not included (when include patterns are specified)
+                if include_spec and not include_spec.match_file(rel):
+                    continue
+
+                if collect_stats:
+                    # DirEntry caches this stat, so repeated metadata use
+                    # downstream costs no further syscalls
+                    try:
+                        item = (Path(entry.path), entry.stat(follow_symlinks=False))
+                    except OSError:
+                        continue
+                else:
+                    item = Path(entry.path)
+
+                if ext:
+                    scannable_files.append(item)
+                else:
+                    # Defer the open+read content sniff: extensionless
+                    # candidates batch up and probe concurrently below,
+                    # a None placeholder holding their position
+                    pending_sniffs.append((len(scannable_files), entry.path, item))
+                    scannable_files.append(None)
+
+    if pending_sniffs:
+        if len(pending_sniffs) >= _SNIFF_PARALLEL_MIN:
+            # The sniff is stat + a 1 KiB read, all GIL-releasing
+            # syscalls, so threads overlap the page-cache misses
+            workers = min(32, (os.cpu_count() or 1) * 4)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                verdicts = list(executor.map(
+                    is_text_file, (p for _, p, _ in pending_sniffs)
+                ))
+        else:
+            verdicts = [is_text_file(p) for _, p, _ in pending_sniffs]
+        for (idx, _, item), is_text in zip(pending_sniffs, verdicts):
+            if is_text:
+                scannable_files[idx] = item
+        scannable_files = [f for f in scannable_files if f is not None]
+
     return scannable_files
 
 
@@ -82,45 +362,28 @@ def is_scannable_file(file_path: Path) -> bool:
     Returns:
         True if file should be scanned
     """
-    # Skip hidden files and directories
-    if any(part.startswith('.') for part in file_path.parts):
-        return False
-    
-    # Skip common directories that shouldn't be scanned
-    skip_dirs = {
-        'node_modules', 'dist', 'build', 'target', '__pycache__', '.git',
-        'vendor', 'bower_components', 'jspm_packages', 'coverage',
-        '.pytest_cache', '.mypy_cache', '.tox', '.venv', 'venv', 'env'
-    }
-    
-    if any(part in skip_dirs for part in file_path.parts):
+    # parts is rebuilt on each property access, so grab it once. The
+    # skip-list test runs as one C-level isdisjoint pass over the tuple;
+    # only the hidden check still loops in Python, with a slice compare
+    # instead of a startswith call
+    parts = file_path.parts
+    if not SKIP_DIRS.isdisjoint(parts):
         return False
-    
+    for part in parts:
+        if part[:1] == '.':
+            return False
+
+    # Path.suffix re-derives the string on every access, so take it once
+    suffix = file_path.suffix
+
     # Check file extension
-    scannable_extensions = {
-        # Programming languages
-        '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.cs', '.php',
-        '.rb', '.go', '.rs', '.swift', '.kt', '.scala', '.dart', '.r', '.m', '.mm',
-        # Web technologies
-        '.html', '.htm', '.css', '.scss', '.sass', '.less', '.vue', '.svelte',
-        # Configuration files
-        '.json', '.yaml', '.yml', '.toml', '.ini', '.cfg', '.conf', '.config',
-        '.env', '.properties', '.xml', '.csv',
-        # Documentation
-        '.md', '.txt', '.rst', '.adoc',
-        # Shell scripts
-        '.sh', '.bash', '.zsh', '.fish', '.ps1', '.bat', '.cmd',
-        # Other
-        '.sql', '.graphql', '.gql', '.proto', '.thrift'
-    }
-    
-    if file_path.suffix.lower() in scannable_extensions:
+    if suffix.lower() in SCANNABLE_EXTENSIONS:
         return True
-    
+
     # Check if it's a text file without extension
-    if not file_path.suffix:
+    if not suffix:
         return is_text_file(file_path)
-    
+
     return False
 
 
@@ -134,28 +397,51 @@ def is_text_file(file_path: Path) -> bool:
     Returns:
         True if file appears to be text
     """
+    # Raw os.open/os.read: no io.BufferedReader setup for a single
+    # 1 KiB probe, and fstat on the open fd replaces a separate
+    # stat-by-path, so the whole sniff is three syscalls
+    fd = None
     try:
+        fd = os.open(file_path, os.O_RDONLY)
+        st = os.fstat(fd)
+        size = st.st_size
+
+        # Repeat scans hit the memo and skip the read entirely
+        key = (st.st_ino, st.st_mtime_ns, size)
+        memo = _sniff_memo.get(str(file_path))
+        if memo is not None and memo[0] == key:
+            return memo[1]
+
         # Check file size (skip very large files)
-        if file_path.stat().st_size > 10 * 1024 * 1024:  # 10MB
+        if size > 10 * 1024 * 1024:  # 10MB
             return False
-        
-        # Read first 1024 bytes to check for binary content
-        with open(file_path, 'rb') as f:
-            chunk = f.read(1024)
-            
-            # Check for null bytes (common in binary files)
-            if b'\x00' in chunk:
-                return False
-            
-            # Check if mostly printable ASCII
-            printable = sum(1 for byte in chunk if 32 <= byte <= 126 or byte in (9, 10, 13))
-            if len(chunk) > 0 and printable / len(chunk) < 0.7:
-                return False
-            
+        if size == 0:
             return True
-            
+
+        # Read first 1024 bytes to check for binary content
+        chunk = os.read(fd, 1024)
+
+        # Check for null bytes (common in binary files)
+        if b'\x00' in chunk:
+            verdict = False
+        else:
+            # Check if mostly printable ASCII; translate() drops the
+            # non-printable bytes in one C pass, so the survivors are
+            # exactly what the old per-byte loop counted
+            printable = len(chunk.translate(None, _NON_PRINTABLE))
+            verdict = not (len(chunk) > 0 and printable / len(chunk) < 0.7)
+
+        _sniff_memo[str(file_path)] = (key, verdict)
+        return verdict
+
     except (IOError, OSError):
         return False
+    finally:
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
 
 
 def get_file_size_mb(file_path: Path) -> float:
@@ -4,19 +4,37 @@ Utilities to fetch public repositories (GitHub) to a local temporary directory.
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Tuple, List
 import tempfile
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import tarfile
 import zipfile
-import io
 import re
 import os
 import shutil
+import time
+
+from .file_utils import SKIP_DIRS, SCANNABLE_EXTENSIONS
 
 
 GITHUB_REPO_RE = re.compile(r"^https?://github\.com/(?P<owner>[^/]+)/(?P<repo>[^/#?]+)(?:/tree/(?P<ref>[^/#?]+))?/?$")
 
+# One session for every github/codeload request in the process: keep-alive
+# reuses the TCP+TLS connection across the ref probes and the archive
+# download (each fresh connection costs ~2 RTT of handshake), and the
+# adapter retries transient gateway errors with backoff
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.3,
+                      status_forcelist=[502, 503, 504]),
+))
+
 
 def parse_github_url(url: str) -> Optional[Tuple[str, str, Optional[str]]]:
     """Parse a GitHub repository URL and return (owner, repo, ref).
@@ -26,7 +44,27 @@ def parse_github_url(url: str) -> Optional[Tuple[str, str, Optional[str]]]:
     - https://github.com/owner/repo/
     - https://github.com/owner/repo/tree/branch
     """
-    match = GITHUB_REPO_RE.match(url.strip())
+    u = url.strip()
+    # Fast path: the accepted URLs are 2-4 slash-separated fields behind
+    # a fixed prefix, which startswith + split resolve without running
+    # the regex engine. Anything with query/fragment characters drops to
+    # the regex so both paths reject the same inputs.
+    for prefix in ("https://github.com/", "http://github.com/"):
+        if u.startswith(prefix):
+            # At most one trailing slash, matching the regex's /?$
+            rest = u[len(prefix):]
+            if rest.endswith("/"):
+                rest = rest[:-1]
+            if "#" not in rest and "?" not in rest:
+                parts = rest.split("/")
+                if len(parts) == 2 and all(parts):
+                    return parts[0], parts[1], None
+                if len(parts) == 4 and parts[2] == "tree" and all(parts):
+                    return parts[0], parts[1], parts[3]
+                return None
+            break
+
+    match = GITHUB_REPO_RE.match(u)
     if not match:
         return None
     owner = match.group("owner")
@@ -35,12 +73,58 @@ def parse_github_url(url: str) -> Optional[Tuple[str, str, Optional[str]]]:
     return owner, repo, ref
 
 
+# Downloaded archives are kept for a short window so repeated fetches of
+# the same repo (dev loops, back-to-back API calls) skip the network and
+# go straight to extraction
+_ARCHIVE_CACHE_DIR = Path.home() / ".cache" / "prompt-injection-scanner"
+_ARCHIVE_CACHE_TTL = 3600  # seconds
+
+
+def _archive_cache_path(owner: str, repo: str, ref: str) -> Path:
+    return _ARCHIVE_CACHE_DIR / f"{owner}_{repo}_{ref}.zip"
+
+
+def _fresh_cached_archive(owner: str, repo: str, explicit_ref: Optional[str]) -> Optional[Path]:
+    """Return a cached archive younger than the TTL for any likely ref."""
+    candidates = [explicit_ref] if explicit_ref else []
+    candidates += ["main", "master", "trunk", "dev", "develop"]
+    now = time.time()
+    for ref in candidates:
+        path = _archive_cache_path(owner, repo, ref)
+        try:
+            if now - path.stat().st_mtime < _ARCHIVE_CACHE_TTL:
+                return path
+        except OSError:
+            continue
+    return None
+
+
+def _store_cached_archive(owner: str, repo: str, ref: str, fileobj) -> None:
+    """Persist a downloaded archive; write a .part sibling, then rename.
+
+    os.replace makes publication atomic, so a concurrent fetch either
+    sees the complete archive or the old/absent one, never a truncated
+    file. Caching is best-effort — an unwritable cache dir is not an
+    error.
+    """
+    try:
+        _ARCHIVE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        target = _archive_cache_path(owner, repo, ref)
+        part = target.with_suffix(f".part.{os.getpid()}")
+        fileobj.seek(0)
+        with open(part, "wb") as out:
+            shutil.copyfileobj(fileobj, out, length=1 << 20)
+        os.replace(part, target)
+    except OSError:
+        pass
+
+
 def _branch_exists_on_codeload(owner: str, repo: str, ref: str) -> bool:
     """Check if a branch exists by probing codeload (no API/rate-limit)."""
     url = f"https://codeload.github.com/{owner}/{repo}/zip/refs/heads/{ref}"
     try:
         # HEAD is cheaper; GitHub codeload returns 200 when the ref exists
-        resp = requests.head(url, timeout=15)
+        resp = _SESSION.head(url, timeout=15)
         return resp.status_code == 200
     except Exception:
         return False
@@ -73,9 +157,18 @@ def _choose_ref_without_api(owner: str, repo: str, explicit_ref: Optional[str])
     seen = set()
     ordered_candidates = [c for c in candidate_order if not (c in seen or seen.add(c))]
 
-    for ref in ordered_candidates:
-        if _branch_exists_on_codeload(owner, repo, ref):
-            return ref
+    # Each probe is one network round-trip, so serial probing pays full
+    # latency per miss. Fan all of them out at once and pick the first
+    # hit in the original priority order, so resolution costs roughly
+    # one round-trip regardless of how many misses precede the hit.
+    with ThreadPoolExecutor(max_workers=len(ordered_candidates)) as executor:
+        exists = executor.map(
+            lambda ref: _branch_exists_on_codeload(owner, repo, ref),
+            ordered_candidates,
+        )
+        for ref, found in zip(ordered_candidates, exists):
+            if found:
+                return ref
 
     # Last resort: fall back to main if none detected
     return explicit_ref or "main"
@@ -95,7 +188,7 @@ def _get_github_default_branch_with_token(owner: str, repo: str) -> Optional[str
             "Authorization": f"token {token}",
             "Accept": "application/vnd.github+json",
         }
-        resp = requests.get(api_url, headers=headers, timeout=15)
+        resp = _SESSION.get(api_url, headers=headers, timeout=15)
         resp.raise_for_status()
         data = resp.json()
         return data.get("default_branch")
@@ -103,9 +196,179 @@ def _get_github_default_branch_with_token(owner: str, repo: str) -> Optional[str
         return None
 
 
+def _candidate_refs(owner: str, repo: str, explicit_ref: Optional[str]) -> List[str]:
+    """Build the ordered list of refs to try for an archive download."""
+    # Prefer codeload probing to avoid GitHub REST API rate limits
+    ref = _choose_ref_without_api(owner, repo, explicit_ref)
+
+    # If we still failed to find a working ref via codeload probing, and a token
+    # exists, try the REST API once to discover the default branch.
+    if not _branch_exists_on_codeload(owner, repo, ref):
+        api_ref = _get_github_default_branch_with_token(owner, repo)
+        if api_ref and _branch_exists_on_codeload(owner, repo, api_ref):
+            ref = api_ref
+
+    candidate_refs: List[str] = [ref]
+    for fallback in ["main", "master", "trunk", "dev", "develop"]:
+        if fallback not in candidate_refs:
+            candidate_refs.append(fallback)
+    return candidate_refs
+
+
+def _flatten_single_subdir(extract_root: Path) -> Path:
+    """Flatten the single <repo>-<ref>/ wrapper GitHub archives unpack to.
+
+    This ensures callers can remove a single directory to clean everything and
+    avoids leaking empty temp parents across requests (which can exhaust /tmp).
+    """
+    subdirs = [p for p in extract_root.iterdir() if p.is_dir()]
+    if len(subdirs) == 1:
+        inner = subdirs[0]
+        try:
+            for child in inner.iterdir():
+                shutil.move(str(child), str(extract_root / child.name))
+            # Remove the empty inner wrapper directory
+            inner.rmdir()
+        except Exception:
+            # Even if flattening fails, return the inner directory so callers
+            # can still scan. Cleanup code should attempt to delete the parent.
+            return inner
+    return extract_root
+
+
+def _member_is_scannable(filename: str) -> bool:
+    """Decide from the archive path alone whether a member is worth extracting.
+
+    Mirrors the walk's filters: skip-list and hidden directories, and
+    extensions outside the scannable set, will be excluded by the scan
+    anyway, so inflating them wastes CPU and disk. The leading component
+    (GitHub's <repo>-<ref>/ wrapper) is exempt, extensionless files stay
+    for the post-extraction text sniff, and .gitignore is kept because
+    the walk reads it to build exclude patterns.
+    """
+    parts = filename.rstrip('/').split('/')
+    name = parts[-1]
+    for part in parts[1:-1]:
+        if part in SKIP_DIRS or part.startswith('.'):
+            return False
+    if name == '.gitignore':
+        return True
+    if name.startswith('.'):
+        return False
+    dot = name.rfind('.')
+    if dot > 0:
+        return name[dot:].lower() in SCANNABLE_EXTENSIONS
+    return True
+
+
+def _extract_zip_parallel(zf: zipfile.ZipFile, extract_root: Path) -> None:
+    """Extract the scan-relevant members of a ZIP with inflate across threads.
+
+    ZipFile serializes raw reads behind an internal lock but runs zlib
+    decompression outside it with the GIL released, so member extraction
+    parallelizes well. _extract_member's makedirs is not race-safe, so
+    all directories are created up front and only files fan out.
+    """
+    files = [
+        m for m in zf.infolist()
+        if not m.is_dir() and _member_is_scannable(m.filename)
+    ]
+    if len(files) < 8:
+        for member in files:
+            zf.extract(member, extract_root)
+        return
+
+    dirs = set()
+    for member in files:
+        parent = os.path.dirname(member.filename)
+        if parent:
+            dirs.add(extract_root / parent)
+    for d in sorted(dirs):
+        os.makedirs(d, exist_ok=True)
+
+    workers = min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # list() propagates the first worker exception
+        list(executor.map(lambda m: zf.extract(m, extract_root), files))
+
+
+def fetch_github_tarball_to_dir(url: str, dest_dir: Optional[Path] = None) -> Path:
+    """Stream-download a repository tarball and extract it to a directory.
+
+    The gzip stream is piped straight from the socket into tarfile, so the
+    archive is never buffered whole in memory and no .git history is pulled.
+
+    Args:
+        url: GitHub repo URL
+        dest_dir: Optional directory to extract into; if None, create a temp dir
+
+    Returns:
+        Path to the extracted repository root directory
+    """
+    parsed = parse_github_url(url)
+    if not parsed:
+        raise ValueError("Unsupported repository URL. Only GitHub public URLs are supported, e.g., https://github.com/owner/repo or /tree/branch")
+    owner, repo, explicit_ref = parsed
+
+    last_status = None
+    for candidate in _candidate_refs(owner, repo, explicit_ref):
+        archive_url = f"https://codeload.github.com/{owner}/{repo}/tar.gz/refs/heads/{candidate}"
+        resp = _SESSION.get(archive_url, timeout=60, stream=True)
+        last_status = resp.status_code
+        if resp.status_code != 200:
+            resp.close()
+            continue
+
+        extract_root = Path(dest_dir) if dest_dir else Path(tempfile.mkdtemp(prefix="repo_"))
+        try:
+            with tarfile.open(fileobj=resp.raw, mode="r|gz") as tar:
+                tar.extractall(extract_root, members=(
+                    m for m in tar
+                    if m.isdir() or _member_is_scannable(m.name)
+                ))
+        finally:
+            resp.close()
+        return _flatten_single_subdir(extract_root)
+
+    raise RuntimeError(
+        "Could not download repository tarball from codeload. "
+        f"Last HTTP status: {last_status}"
+    )
+
+
 def fetch_github_repo_to_dir(url: str, dest_dir: Optional[Path] = None) -> Path:
     """Download and extract a public GitHub repository to a directory.
 
+    Prefers the streaming tarball download; falls back to the buffered ZIP
+    path if the tarball fetch fails for any non-URL reason.
+
+    Args:
+        url: GitHub repo URL
+        dest_dir: Optional directory to extract into; if None, create a temp dir
+
+    Returns:
+        Path to the extracted repository root directory
+    """
+    parsed = parse_github_url(url)
+    if parsed and _fresh_cached_archive(*parsed[:2], parsed[2]) is not None:
+        # Warm archive cache: the ZIP path extracts it with no network
+        return fetch_github_zip_to_dir(url, dest_dir=dest_dir)
+    try:
+        return fetch_github_tarball_to_dir(url, dest_dir=dest_dir)
+    except ValueError:
+        raise
+    except Exception:
+        return fetch_github_zip_to_dir(url, dest_dir=dest_dir)
+
+
+def fetch_github_zip_to_dir(url: str, dest_dir: Optional[Path] = None) -> Path:
+    """Download and extract a repository ZIP archive (fallback path).
+
+    The response streams into a spooled temp file (disk-backed past 64 MB)
+    that ZipFile then reads directly, so the archive is never held whole in
+    memory — the ZIP format needs a seekable source, which rules out the
+    socket-piping the tarball path uses.
+
     Args:
         url: GitHub repo URL
         dest_dir: Optional directory to extract into; if None, create a temp dir
@@ -118,34 +381,39 @@ def fetch_github_repo_to_dir(url: str, dest_dir: Optional[Path] = None) -> Path:
         raise ValueError("Unsupported repository URL. Only GitHub public URLs are supported, e.g., https://github.com/owner/repo or /tree/branch")
     owner, repo, explicit_ref = parsed
 
-    # Prefer codeload probing to avoid GitHub REST API rate limits
-    ref = _choose_ref_without_api(owner, repo, explicit_ref)
-
-    # If we still failed to find a working ref via codeload probing, and a token
-    # exists, try the REST API once to discover the default branch.
-    if not _branch_exists_on_codeload(owner, repo, ref):
-        api_ref = _get_github_default_branch_with_token(owner, repo)
-        if api_ref and _branch_exists_on_codeload(owner, repo, api_ref):
-            ref = api_ref
+    cached = _fresh_cached_archive(owner, repo, explicit_ref)
+    if cached is not None:
+        try:
+            extract_root = Path(dest_dir) if dest_dir else Path(tempfile.mkdtemp(prefix="repo_"))
+            with zipfile.ZipFile(cached) as zf:
+                _extract_zip_parallel(zf, extract_root)
+            return _flatten_single_subdir(extract_root)
+        except (zipfile.BadZipFile, OSError):
+            # Corrupt or vanished cache entry: fall through to download
+            pass
 
-    # Try to download the archive, iterating through reasonable fallbacks
-    candidate_refs: List[str] = [ref]
-    for fallback in ["main", "master", "trunk", "dev", "develop"]:
-        if fallback not in candidate_refs:
-            candidate_refs.append(fallback)
+    candidate_refs = _candidate_refs(owner, repo, explicit_ref)
 
-    r = None
+    spooled = None
     last_status = None
     for candidate in candidate_refs:
         archive_url = f"https://codeload.github.com/{owner}/{repo}/zip/refs/heads/{candidate}"
-        resp = requests.get(archive_url, timeout=60)
+        resp = _SESSION.get(archive_url, timeout=60, stream=True)
         last_status = resp.status_code
-        if resp.status_code == 200:
-            r = resp
-            ref = candidate
-            break
-
-    if r is None:
+        if resp.status_code != 200:
+            resp.close()
+            continue
+        try:
+            spooled = tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024)
+            for chunk in resp.iter_content(chunk_size=1 << 20):
+                spooled.write(chunk)
+        finally:
+            resp.close()
+        _store_cached_archive(owner, repo, candidate, spooled)
+        spooled.seek(0)
+        break
+
+    if spooled is None:
         tried = ", ".join(candidate_refs)
         raise RuntimeError(
             "Could not download repository archive from codeload. "
@@ -155,29 +423,11 @@ def fetch_github_repo_to_dir(url: str, dest_dir: Optional[Path] = None) -> Path:
             f"Last HTTP status: {last_status}"
         )
 
-    zf = zipfile.ZipFile(io.BytesIO(r.content))
-
     extract_root = Path(dest_dir) if dest_dir else Path(tempfile.mkdtemp(prefix="repo_"))
-    zf.extractall(extract_root)
+    with spooled, zipfile.ZipFile(spooled) as zf:
+        _extract_zip_parallel(zf, extract_root)
 
-    # Many GitHub archives unwrap to a single nested folder: <repo>-<ref>/
-    # Flatten so that the returned path is the temp root itself. This ensures
-    # callers can remove a single directory to clean everything and avoids
-    # leaking empty temp parents across requests (which can exhaust /tmp).
-    subdirs = [p for p in extract_root.iterdir() if p.is_dir()]
-    if len(subdirs) == 1:
-        inner = subdirs[0]
-        try:
-            for child in inner.iterdir():
-                shutil.move(str(child), str(extract_root / child.name))
-            # Remove the empty inner wrapper directory
-            inner.rmdir()
-        except Exception:
-            # Even if flattening fails, return the inner directory so callers
-            # can still scan. Cleanup code should attempt to delete the parent.
-            return inner
-
-    return extract_root
+    return _flatten_single_subdir(extract_root)
 
 
 
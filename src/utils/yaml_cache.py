@@ -0,0 +1,69 @@
+"""
+Pickle-backed cache for parsed YAML files.
+
+PyYAML's pure-Python parser dominates cold-start time on serverless, so
+parsed objects are cached on disk keyed on (path, mtime, size) and reused
+as long as the source file is unchanged.
+"""
+
+import hashlib
+import pickle
+from pathlib import Path
+from typing import Any, Optional
+
+import yaml
+
+try:
+    # libyaml C binding, ~3x faster than the pure-Python parser
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+CACHE_DIR = Path.home() / '.prompt-scanner' / 'cache'
+
+
+def _cache_file_for(path: Path) -> Optional[Path]:
+    """Compute the cache file path for a YAML file, or None if unstatable."""
+    try:
+        stat = path.stat()
+        key = hashlib.blake2b(
+            f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode()
+        ).hexdigest()
+        return CACHE_DIR / f"{key}.pkl"
+    except (IOError, OSError):
+        return None
+
+
+def load_yaml_cached(path: Path) -> Any:
+    """
+    Load and parse a YAML file, skipping the parse entirely on a warm cache.
+
+    Args:
+        path: Path to the YAML file
+
+    Returns:
+        Parsed Python object (as from yaml.safe_load)
+    """
+    cache_file = _cache_file_for(path)
+
+    # Warm path: unpickle the previously parsed object
+    if cache_file is not None and cache_file.exists():
+        try:
+            with open(cache_file, 'rb') as f:
+                return pickle.load(f)
+        except (IOError, OSError, pickle.PickleError):
+            pass
+
+    # Cold path: parse and cache for the next run
+    with open(path, 'r') as f:
+        data = yaml.load(f, Loader=_YamlLoader)
+
+    if cache_file is not None:
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            with open(cache_file, 'wb') as f:
+                pickle.dump(data, f, protocol=5)
+        except (IOError, OSError, pickle.PickleError):
+            pass
+
+    return data